@@ -0,0 +1,11 @@
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from helper.AsgiAdapter import AsgiAdapter
+
+# SHARED_CACHE_PATH=/dev/shm/micropy.cache uvicorn asgi:app --workers 4 --port 8001
+# several workers need SHARED_CACHE_PATH to invalidate each other's caches, the warm-up and
+# this check run in the lifespan startup
+app = AsgiAdapter()
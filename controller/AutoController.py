@@ -2,39 +2,55 @@ from interface.IController import IController
 from model.AutoModel import AutoModel
 from helper.Response import Response
 from helper.AuthController import AuthController
+from helper.Middleware import Middleware
 
 class AutoController(AuthController, IController):
+    # conditional GET: ETag from the autos write counter, clients revalidate on every poll
+    cache_tables = ("autos",)
+    cache_max_age = 0
+    # a single client flooding /auto must not starve the others
+    max_concurrency = 32
+    # reading needs a valid token, creating an admin token, see helper/Middleware.py
+    middleware = {"get": ("auth",) + Middleware.DEFAULT, "post": ("auth", "admin") + Middleware.DEFAULT}
+
     def __init__(self):
         super().__init__()
     
     def get(self, data, headers):
-        decoded = self.authenticate(headers)
-        if isinstance(decoded, dict) and "status_code" in decoded:
-            return decoded  # Return error response if authentication fails
-
         autoModel = AutoModel()
+        action = data.pop("action", None)
+        if action:
+            return self.__action(autoModel, action, data)
         if data.get("id"):
-            result = autoModel.single(data["id"])
+            ids = self.__parseIds(data["id"])
+            if not ids:
+                return Response.bad_request("Invalid auto ID format")
+            if len(ids) > 1:
+                # /auto?id=1,2,3 -> one IN query instead of one query per id
+                result = autoModel.many(ids)
+                if result is None:
+                    return Response.bad_request(f"Failed to get autos {autoModel.error}")
+                return Response.success(result)
+            result = autoModel.single(ids[0])
             if not result:
                 return Response.bad_request(f"Failed to get auto {autoModel.error}")
             return Response.success(result)
-        result = autoModel.list()
-        if not result:
+        # ?name__prefix=BM&ps__gte=100&sort=-ps&limit=20, without parameters the full list
+        result = autoModel.query(data) if data else autoModel.list()
+        if result is None:
             return Response.bad_request(f"Failed to get autos {autoModel.error}")
         return Response.success(result)
     
     def post(self, data, headers):
-        # Authenticate the user
-        decoded = self.authenticate(headers)
-        if isinstance(decoded, dict) and "status_code" in decoded:
-            return decoded  # Return error response if authentication fails
-
-        # Authorize the user for admin role
-        auth_result = self.authorize(decoded, required_role="admin")
-        if isinstance(auth_result, dict) and "status_code" in auth_result:
-            return auth_result  # Return error response if authorization fails
-
         autoModel = AutoModel()
+        if not isinstance(data, dict):
+            # NDJSON upload, records are validated and inserted while they arrive
+            result = autoModel.createMany(data)
+            if "error" in result:
+                # the rows before the broken line are committed, the client learns which ones
+                return Response(result["error"]["status_code"], result)
+            return Response.success(result)
+
         created = autoModel.create(data["name"], data["ps"])
         if not created:
             return Response.bad_request(f"Failed to create auto {autoModel.error}")
@@ -64,5 +80,27 @@ class AutoController(AuthController, IController):
         if not updated:
             return Response.bad_request(f"Failed to update auto {autoModel.error}")
         return Response.success({"success": "Auto updated successfully"})
-    
 
+#--------------------Private Methods ---------------------------------------
+
+    def __action(self, autoModel, action, data):
+        """GET /auto/count and /auto/stats, computed in SQL with the same filters as the list"""
+        if action == "count":
+            result = autoModel.count(data)
+            if result is None:
+                return Response.bad_request(f"Failed to count autos {autoModel.error}")
+            return Response.success({"count": result})
+        if action == "stats":
+            result = autoModel.aggregate(data)
+            if result is None:
+                return Response.bad_request(f"Failed to get auto stats {autoModel.error}")
+            return Response.success(result)
+        return Response.not_found(f"Unknown action '{action}'")
+
+    def __parseIds(self, value):
+        """accepts 1, "1", "1,2,3" and ["1,2", "3"] (repeated query parameters)"""
+        values = value if isinstance(value, list) else [value]
+        try:
+            return [int(part) for item in values for part in str(item).split(",") if part.strip()]
+        except ValueError:
+            return None
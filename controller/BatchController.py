@@ -0,0 +1,99 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from interface.IController import IController
+from helper.Response import Response
+from helper.AuthController import AuthController
+from helper.AuthenticatedHeaders import AuthenticatedHeaders
+from helper.Dispatcher import Dispatcher
+
+class BatchController(AuthController, IController):
+    """
+    Many controller calls in one HTTP request
+
+    POST /batch
+    {
+        "requests": [
+            {"method": "GET", "controller": "auto", "params": {"id": 1}},
+            {"method": "GET", "controller": "auto", "params": {"id": 2}},
+            {"method": "POST", "controller": "auto", "body": {"name": "Golf", "ps": 90}}
+        ]
+    }
+
+    The Authorization header of the batch is verified once and shared by all sub-requests.
+    Consecutive GET sub-requests run in parallel, any other method waits for everything before it
+    and blocks everything after it. Results are returned in request order, each one in the
+    normal response format.
+    """
+    MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", 50))
+    WORKERS = int(os.getenv("BATCH_WORKERS", 8))
+
+    _executor = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__()
+
+    def post(self, data, headers):
+        requests = data.get("requests") if isinstance(data, dict) else None
+        if not isinstance(requests, list) or not requests:
+            return Response.bad_request("Body must contain a non-empty 'requests' list")
+        if len(requests) > self.MAX_REQUESTS:
+            return Response.bad_request(f"A batch may contain at most {self.MAX_REQUESTS} requests")
+
+        if headers.get("Authorization"):
+            decoded = self.authenticate(headers)
+            if isinstance(decoded, dict) and "status_code" in decoded:
+                return decoded  # Return error response if authentication fails
+            headers = AuthenticatedHeaders(headers, decoded)
+
+        results = [None] * len(requests)
+        parallel = []
+        for index, request in enumerate(requests):
+            if isinstance(request, dict) and str(request.get("method", "GET")).upper() == "GET":
+                parallel.append(index)
+                continue
+            self.__run_parallel(parallel, requests, headers, results)
+            parallel = []
+            results[index] = self.__execute(request, headers)
+        self.__run_parallel(parallel, requests, headers, results)
+        return Response.success([result.to_dict() for result in results])
+
+    def get(self, data, headers):
+        return Response.response(405, "Use POST /batch")
+
+    def put(self, data, headers):
+        return Response.response(405, "Use POST /batch")
+
+    def destroy(self, data, headers):
+        return Response.response(405, "Use POST /batch")
+
+#--------------------Private Methods ---------------------------------------
+
+    def __run_parallel(self, indexes, requests, headers, results):
+        if len(indexes) == 1:
+            results[indexes[0]] = self.__execute(requests[indexes[0]], headers)
+        elif indexes:
+            futures = [(index, self.__pool().submit(self.__execute, requests[index], headers)) for index in indexes]
+            for index, future in futures:
+                results[index] = future.result()
+
+    def __execute(self, request, headers):
+        if not isinstance(request, dict) or not isinstance(request.get("controller"), str):
+            return Response.bad_request("Each request needs a 'controller'")
+        method_HTTP = str(request.get("method", "GET")).upper()
+        if method_HTTP not in Dispatcher.METHOD_MAP or request["controller"].lower() == "batch":
+            return Response.bad_request(f"{method_HTTP} /{request['controller']} is not allowed in a batch")
+        if method_HTTP == "GET":
+            data = request.get("params") or {}
+        else:
+            data = request.get("body") or {}
+        return Dispatcher.call(method_HTTP, Dispatcher.controller_name(request["controller"]), data, headers, self.client_address)
+
+    @classmethod
+    def __pool(cls):
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=cls.WORKERS, thread_name_prefix="batch")
+        return cls._executor
@@ -0,0 +1,74 @@
+from interface.IController import IController
+from helper.Response import Response
+from helper.AuthController import AuthController
+from helper.Middleware import Middleware
+from helper.SamplingProfiler import SamplingProfiler
+
+class ProfilerController(AuthController, IController):
+    """
+    Admin endpoint for the built-in sampling profiler
+
+    POST   /profiler  {"interval": 0.01, "seconds": 60}  start sampling in the background
+    GET    /profiler                                      status, top frames and collapsed stacks
+    GET    /profiler?seconds=10                           sample a 10 second window, then return it
+    PUT    /profiler                                      discard collected samples
+    DELETE /profiler                                      stop sampling
+    """
+    MAX_WINDOW = 60
+    # every method is for admins only
+    middleware = ("auth", "admin") + Middleware.DEFAULT
+
+    def __init__(self):
+        super().__init__()
+
+    def get(self, data, headers):
+        data = data or {}
+        seconds = self.__number(data, "seconds")
+        if seconds:
+            interval = self.__number(data, "interval") or SamplingProfiler.DEFAULT_INTERVAL
+            if not SamplingProfiler.profile(min(seconds, self.MAX_WINDOW), interval=interval,
+                                            include_idle=self.__flag(data, "idle")):
+                return Response.conflict("Profiler is already running")
+
+        limit = self.__number(data, "limit")
+        result = SamplingProfiler.status()
+        result["top"] = SamplingProfiler.top()
+        result["collapsed"] = SamplingProfiler.collapsed(int(limit) if limit else None)
+        return Response.success(result)
+
+    def post(self, data, headers):
+        data = data if isinstance(data, dict) else {}
+        interval = self.__number(data, "interval") or SamplingProfiler.DEFAULT_INTERVAL
+        seconds = self.__number(data, "seconds")
+        if not SamplingProfiler.start(interval=interval, duration=seconds,
+                                      include_idle=self.__flag(data, "idle")):
+            return Response.conflict("Profiler is already running")
+        return Response.success(SamplingProfiler.status())
+
+    def put(self, data, headers):
+        SamplingProfiler.clear()
+        return Response.success(SamplingProfiler.status())
+
+    def destroy(self, data, headers):
+        if not SamplingProfiler.stop():
+            return Response.bad_request("Profiler is not running")
+        return Response.success(SamplingProfiler.status())
+
+#--------------------Private Methods ---------------------------------------
+
+    def __value(self, data, key):
+        value = data.get(key)
+        # query parameters arrive as lists from parse_qs
+        if isinstance(value, list):
+            value = value[0] if value else None
+        return value
+
+    def __number(self, data, key):
+        try:
+            value = self.__value(data, key)
+            return float(value) if value not in (None, "") else None
+        except (TypeError, ValueError):
+            return None
+
+    def __flag(self, data, key):
+        return str(self.__value(data, key)).lower() in ("1", "true", "yes")
@@ -15,6 +15,8 @@ class UserController(IController):
         userModel = UserModel()
         
         created = userModel.create(data["email"], data["password"], data["name"])
+        if not created and userModel.conflict:
+            return Response.conflict(f"Failed to create user {userModel.error}")
         if not created: 
             return Response.bad_request(f"Failed to create user {userModel.error}")
         return Response.success({"success": "User created successfully"})
@@ -0,0 +1,182 @@
+import os
+import shlex
+import sys
+from http import HTTPStatus
+from http.client import HTTPMessage
+from urllib.parse import urlparse, parse_qs
+from helper.HttpError import HttpError
+from helper.Compression import Compression
+from helper.Dispatcher import Dispatcher
+from helper.Middleware import Middleware
+from helper.QueryCache import QueryCache
+from helper.Request import Request
+from helper.WarmStart import WarmStart
+from helper.TrafficCapture import TrafficCapture
+from helper.Response import Response
+from helper.TableVersion import TableVersion
+
+class Application:
+    """
+    One request through the framework, independent of the server that received it
+
+    HttpHandler (http.server), WsgiAdapter, AsgiAdapter and the in-process client all hand the
+    request over as method, path with query string, headers and body stream, and write out what
+    handle() returns. Routing, authentication headers, the JSON body and query parameter
+    contract, the middleware of the route (see Middleware) and traffic capture are the same
+    for all of them.
+
+        application = Application("GET", "/auto?ps__gte=100", headers, rfile, "127.0.0.1")
+        status_code, headers, body = application.handle()
+    """
+
+    def __init__(self, method_HTTP: str, path: str, headers, rfile, client_address: str, until_eof: bool = False):
+        """
+        headers: case-insensitive mapping with get() (http.client.HTTPMessage, see Application.request_headers)
+        until_eof: rfile ends with the body, the server already removed the chunked framing (WSGI, ASGI)
+        """
+        self.method_HTTP = method_HTTP
+        self.path = path
+        self.headers = headers
+        self.rfile = rfile
+        self.client_address = client_address
+        self.until_eof = until_eof
+        # the rest of the request body may be unread, the connection can not be reused
+        self.close_connection = False
+        self._capture = None
+
+    @classmethod
+    def start(cls) -> dict:
+        """run once per process before the first request: connections and hot cache entries are made ready"""
+        cls.__check_workers(cls.workers())
+        # a controller declaring an unknown middleware fails here instead of on its first request
+        Dispatcher.compile_routes()
+        warm = WarmStart.start()
+        if any(warm.values()):
+            print(f"🔥 Warm-up: {warm['connections']} connections, {warm['models']} models, {warm['restored']} cache entries restored, {warm['primed']} primed")
+        return warm
+
+    @staticmethod
+    def workers() -> int:
+        """
+        worker processes of the server: --workers / -w of the gunicorn or uvicorn command line
+        (workers inherit it), GUNICORN_CMD_ARGS or WEB_CONCURRENCY, 1 if none is given
+        """
+        args = sys.argv[1:] + shlex.split(os.getenv("GUNICORN_CMD_ARGS", ""))
+        for i, arg in enumerate(args):
+            value = None
+            if arg.startswith("--workers="):
+                value = arg.split("=", 1)[1]
+            elif arg in ("--workers", "-w") and i + 1 < len(args):
+                value = args[i + 1]
+            elif arg.startswith("-w") and arg[2:].isdigit():
+                value = arg[2:]
+            if value and value.isdigit():
+                return int(value)
+        concurrency = os.getenv("WEB_CONCURRENCY", "")
+        return int(concurrency) if concurrency.isdigit() else 1
+
+    @staticmethod
+    def request_headers(pairs) -> HTTPMessage:
+        """request headers from (name, value) pairs, the same type http.server passes to controllers"""
+        headers = HTTPMessage()
+        for name, value in pairs:
+            headers[name] = value
+        return headers
+
+    @staticmethod
+    def reason(status_code: int) -> str:
+        try:
+            return HTTPStatus(status_code).phrase
+        except ValueError:
+            return ""
+
+    def handle(self) -> tuple:
+        """(status code, [(header name, value), ...], body bytes)"""
+        self._capture = TrafficCapture.begin(self.method_HTTP, self.path, self.headers)
+        if self.method_HTTP not in Dispatcher.METHOD_MAP:
+            # http.server answers these itself, WSGI and ASGI servers pass every method on.
+            # Not Response.static(): the method is chosen by the client, the cache would grow with it
+            return self.__send(Response(501, f"Unsupported method ('{self.method_HTTP}')"))
+        validation_result = self.__validateRequestParts()
+
+        if isinstance(validation_result, Response):  # Error case
+            return self.__send(validation_result)
+
+        controller_name, query_params = validation_result  # Unpack
+        handler = Dispatcher.route(controller_name, self.method_HTTP)
+        if isinstance(handler, Response):
+            return self.__send(handler)
+
+        request = Request(self.method_HTTP, self.path, self.headers, query_params if self.method_HTTP == "GET" else None,
+                          self.client_address, self.rfile, self.until_eof, self._capture)
+        try:
+            response = handler(request)
+        except HttpError as e:
+            self.close_connection = True
+            return self.__send(e.response(), request, e.headers)
+        except Exception as e:
+            return self.__send(Response.internal_error(str(e)), request)
+        if self.method_HTTP in Middleware.BODY_METHODS and (not request.body_read or request.streaming and response.status_code >= 400):
+            # rejected before the body was read, or a streamed upload that failed part way:
+            # the connection can not be reused
+            self.close_connection = True
+        return self.__send(response, request)
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __check_workers(workers: int) -> None:
+        """
+        the table write counters are per process unless SHARED_CACHE_PATH shares them, with several
+        workers a write in one of them would not invalidate the caches of the others
+        """
+        if workers <= 1 or QueryCache.SHARED_PATH:
+            return
+        if TableVersion.SINGLE_WRITER:
+            raise RuntimeError(f"SINGLE_WRITER=true does not hold with {workers} worker processes, set SHARED_CACHE_PATH (e.g. /dev/shm/micropy.cache)")
+        if QueryCache.ENABLED:
+            print(f"⚠️ {workers} workers without SHARED_CACHE_PATH: cached query results can be stale for up to {QueryCache.MAX_AGE:g} seconds after a write in another worker")
+        else:
+            print(f"⚠️ {workers} workers without SHARED_CACHE_PATH: query cache and version ETags are off, set SHARED_CACHE_PATH to share them")
+
+    def __validateRequestParts(self):
+        parsed_url = urlparse(self.path)
+        path_parts = parsed_url.path.strip('/').split('/')
+        query_params = parse_qs(parsed_url.query)
+
+        if len(path_parts) < 1:
+            return Response.static(400, "Invalid request. Use /Controller or /Controller?id=value")
+
+        controller_name = Dispatcher.controller_name(path_parts[0])
+
+        # Handle GET requests with optional ID
+        if self.method_HTTP == "GET" and len(path_parts) > 1 and path_parts[1].isdigit():
+            query_params["id"] = path_parts[1]
+        # /controller/<action>, e.g. /auto/stats
+        elif self.method_HTTP == "GET" and len(path_parts) > 1 and path_parts[1]:
+            query_params["action"] = path_parts[1]
+
+        return controller_name, query_params
+
+    def __send(self, response, request=None, headers=None):
+        """
+        the output for a Response, with the headers the middleware added (ETag, Server-Timing, ...)
+        and `headers` of an HttpError. The Response itself is never changed, it may be shared
+        between requests
+        """
+        encoding = request.encoding if request else None
+        extra = {**request.response_headers, **(headers or {})} if request else headers or {}
+        if response.status_code == 304:
+            TrafficCapture.finish(self._capture, 304, b"")
+            return 304, [("Vary", "Accept-Encoding"), *extra.items()], b""
+        plain = body = response.body if response.status_code != 204 else b""
+        output = [("Content-Type", "application/json")]
+        if Compression.applies(encoding, len(body)):
+            body = Compression.compress(body, encoding)
+            output.append(("Content-Encoding", encoding))
+        output.append(("Vary", "Accept-Encoding"))
+        output.append(("Content-Length", str(len(body))))
+        output.extend((response.headers or {}).items())
+        output.extend(extra.items())
+        TrafficCapture.finish(self._capture, response.status_code, plain)
+        return response.status_code, output, body
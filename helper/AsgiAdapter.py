@@ -0,0 +1,90 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from helper.Application import Application
+
+class AsgiAdapter:
+    """
+    ASGI application (HTTP and lifespan) around Application, for uvicorn, hypercorn, daphne, ...
+
+        SHARED_CACHE_PATH=/dev/shm/micropy.cache uvicorn asgi:app --workers 4 --port 8001
+
+    Controllers and models are synchronous, each request runs on a thread of a pool of
+    ASGI_THREADS threads while the event loop keeps accepting connections. The request body is
+    streamed from the event loop to that thread, NDJSON uploads are still processed while they
+    arrive. The lifespan startup runs the warm-up of Application.start().
+    """
+    THREADS = int(os.getenv("ASGI_THREADS", 32))
+    PATH_SAFE = "/:@!$&'()*+,;=-._~"
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.THREADS, thread_name_prefix="asgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.__lifespan(receive, send)
+        if scope["type"] != "http":
+            # no websockets, refuse the handshake
+            await receive()
+            return await send({"type": "websocket.close"})
+
+        loop = asyncio.get_running_loop()
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        path = quote(path, safe=self.PATH_SAFE) or "/"
+        if scope.get("query_string"):
+            path += "?" + scope["query_string"].decode("latin-1")
+        headers = Application.request_headers((name.decode("latin-1"), value.decode("latin-1"))
+                                              for name, value in scope["headers"])
+        client = scope.get("client")
+        application = Application(scope["method"], path, headers, _AsgiInput(receive, loop),
+                                  client[0] if client else "", until_eof=True)
+
+        status_code, headers, body = await loop.run_in_executor(self._executor, application.handle)
+        await send({"type": "http.response.start", "status": status_code,
+                    "headers": [(name.encode("latin-1"), str(value).encode("latin-1")) for name, value in headers]})
+        await send({"type": "http.response.body", "body": body})
+
+#--------------------Private Methods ---------------------------------------
+
+    async def __lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await loop.run_in_executor(self._executor, Application.start)
+                except Exception as e:
+                    # the server must not start without the checks and the warm-up
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+class _AsgiInput:
+    """file-like read() for the request handling thread, pulls http.request messages from the event loop"""
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = b""
+        self._more = True
+
+    def read(self, size: int = -1) -> bytes:
+        while self._more and (size < 0 or len(self._buffer) < size):
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message["type"] == "http.disconnect":
+                self._more = False
+                break
+            self._buffer += message.get("body", b"")
+            self._more = message.get("more_body", False)
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
@@ -11,15 +11,29 @@ class AuthController:
         self.jwt_manager = JWTManager()
 
     def authenticate(self, headers):
+        """
+        the verified token claims, or the error dict {"status_code": 403, "status", "message"}:
+            if isinstance(decoded, dict) and "status_code" in decoded: return decoded
+        """
+        claims = getattr(headers, "claims", None)
+        if isinstance(claims, dict):
+            # token was already verified for this request (see AuthenticatedHeaders)
+            self.role = claims.get("role")
+            self.user_id = claims.get("user_id")
+            return claims
+
         auth_header = headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
-            return Response.forbidden("Authorization header missing or malformed")
+            return Response.static(403, "Authorization header missing or malformed").to_dict()
+        if claims is False:
+            # already verified for this request and rejected
+            return Response.static(403, "Invalid or expired token").to_dict()
 
         # Extract the token from the header
         token = auth_header.split(' ')[1]
         decoded = self.jwt_manager.verify(token)
         if not decoded:
-            return Response.forbidden("Invalid or expired token")
+            return Response.static(403, "Invalid or expired token").to_dict()
         self.role = decoded.get("role")
         self.user_id = decoded.get("user_id")
         return decoded
@@ -27,7 +41,7 @@ class AuthController:
     def authorize(self, decoded_token, required_role=None):
         user_role = decoded_token.get("role")
         if required_role and user_role != required_role:
-            return Response.forbidden("Insufficient permissions")
+            return Response.static(403, "Insufficient permissions").to_dict()
 
         self.user_id = decoded_token.get("user_id")
         self.role = decoded_token.get("role")
@@ -0,0 +1,25 @@
+class AuthenticatedHeaders:
+    """
+    Request headers together with the JWT claims that were already verified for this request.
+    AuthController.authenticate() trusts the claims instead of decoding the token again, which
+    lets a batch of sub-requests share one authentication.
+    Only server code can create it, a client can not set the claims through a header.
+
+    claims is False when the token was already checked and is missing or invalid, the request is
+    then rejected without verifying the token a second time.
+    """
+    def __init__(self, headers, claims: bool|dict):
+        self.headers = headers
+        self.claims = claims
+
+    def get(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def __getitem__(self, name):
+        return self.headers[name]
+
+    def __contains__(self, name):
+        return name in self.headers
+
+    def __iter__(self):
+        return iter(self.headers)
@@ -0,0 +1,43 @@
+import hashlib
+import math
+import threading
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives
+
+    `item in bloom` is False only for items that were never added ("definitely new"), True
+    means "maybe added" and has to be confirmed elsewhere. Items can not be removed. With
+    `capacity` items added the false positive rate is about `error_rate`, it rises slowly
+    beyond that.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(int(capacity), 1)
+        self.size = max(int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def add(self, item: str) -> None:
+        positions = self.__positions(item)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+#--------------------Private Methods ---------------------------------------
+
+    def __positions(self, item: str) -> list:
+        # double hashing: k positions from two 64 bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
@@ -0,0 +1,114 @@
+import os
+import zlib
+
+try:
+    import brotli  # optional, pip install brotli
+except ImportError:
+    brotli = None
+
+
+class Compression:
+    """
+    Content-Encoding negotiation and (de)compression for request and response bodies
+
+    gzip and deflate come from zlib and are always available, br is offered when the optional
+    brotli package is installed. Besides one-shot helpers there are incremental compressor and
+    decompressor objects (compress/flush, decompress/flush) for bodies that are streamed in chunks.
+    """
+    MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))   # smaller bodies are not worth it
+    LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))             # 1 (fast) .. 9 (small)
+
+    # server preference when the client accepts several encodings with the same quality
+    PREFERENCE = ("br", "gzip", "deflate") if brotli else ("gzip", "deflate")
+
+    _WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+    @staticmethod
+    def negotiate(accept_encoding: str) -> str | None:
+        """pick the response encoding for an Accept-Encoding header, None means identity"""
+        if not accept_encoding or Compression.LEVEL <= 0:
+            return None
+        qualities = {}
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            quality = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            qualities[name.strip().lower()] = quality
+
+        best, best_quality = None, 0.0
+        for encoding in Compression.PREFERENCE:
+            quality = qualities.get(encoding, qualities.get("*", 0.0))
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    @staticmethod
+    def is_supported(encoding: str) -> bool:
+        return encoding in Compression._WBITS or (encoding == "br" and brotli is not None)
+
+    @staticmethod
+    def compress(body: bytes, encoding: str, level: int = None) -> bytes:
+        compressor = Compression.compressor(encoding, level)
+        return compressor.compress(body) + compressor.flush()
+
+    @staticmethod
+    def decompress(body: bytes, encoding: str) -> bytes:
+        decompressor = Compression.decompressor(encoding)
+        return decompressor.decompress(body) + decompressor.flush()
+
+    @staticmethod
+    def compressor(encoding: str, level: int = None):
+        level = Compression.LEVEL if level is None else level
+        if encoding == "br" and brotli is not None:
+            return _BrotliCompressor(level)
+        return zlib.compressobj(level, zlib.DEFLATED, Compression._WBITS[encoding])
+
+    @staticmethod
+    def decompressor(encoding: str):
+        if encoding == "br" and brotli is not None:
+            return _BrotliDecompressor()
+        return zlib.decompressobj(Compression._WBITS[encoding])
+
+    @staticmethod
+    def applies(encoding: str | None, size: int) -> bool:
+        """a body of `size` bytes is sent with `encoding`, smaller than MIN_SIZE it goes out as is"""
+        return bool(encoding) and size >= Compression.MIN_SIZE
+
+    @staticmethod
+    def etag(etag: str, encoding: str | None, size: int) -> str:
+        """
+        a compressed body is a different representation and needs its own strong ETag
+        '"abc"' -> '"abc-gzip"', unchanged when the body of `size` bytes is not compressed
+        """
+        if not etag or not Compression.applies(encoding, size):
+            return etag
+        return etag[:-1] + "-" + encoding + '"'
+
+
+class _BrotliCompressor:
+    """zlib-like interface around brotli.Compressor"""
+    def __init__(self, level: int):
+        # brotli quality goes up to 11, map the zlib scale on it
+        self._compressor = brotli.Compressor(quality=min(11, max(0, level + 2)))
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _BrotliDecompressor:
+    def __init__(self):
+        self._decompressor = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.process(data)
+
+    def flush(self) -> bytes:
+        return b""
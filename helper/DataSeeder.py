@@ -0,0 +1,271 @@
+import datetime
+import itertools
+import os
+import random
+import time
+import bcrypt
+from sqlalchemy import insert, select, func
+from sqlalchemy.exc import DBAPIError
+from table.DBConnection import DBConnection
+from helper.DatabaseMigration import DatabaseMigration
+from helper.SearchIndex import SearchIndex
+# imported for its side effect: with SHARED_CACHE_PATH the table counters are shared
+import helper.QueryCache
+from helper.TableVersion import TableVersion
+
+class DataSeeder:
+    """
+    Synthetic rows for the table models in table/, bulk-loaded for benchmarks
+
+    Values follow the column types of the model. Integers, floats and dates are uniform by
+    default, strings are drawn from a vocabulary with a Zipf skew (a few values are very
+    common, most are rare), unique columns get sequential values. Every column can be given
+    its own distribution:
+
+        uniform:LOW:HIGH     numbers or dates (days from 2024-01-01) between LOW and HIGH
+        normal:MEAN:STDDEV   numbers around MEAN
+        zipf:S:N             integers 1..N, 1 most common, or the vocabulary of a string column
+        choice:a|b|c         one of the listed values
+        sequence             1, 2, 3, ... (strings: <column>-1, <column>-2, ...)
+
+    Columns named email and password get unique addresses and one of a small pool of bcrypt
+    hashes of seed-password-0, seed-password-1, ... that is hashed once per run.
+
+    The same seed produces the same rows, independent of the batch size and of the other
+    tables and columns that are seeded.
+    """
+    BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", 50000))
+    PASSWORD_POOL = int(os.getenv("SEED_PASSWORD_POOL", 8))
+    # start of the range for uniform dates, fixed so the rows do not depend on today
+    EPOCH = datetime.datetime(2024, 1, 1)
+    VOCABULARY_SIZE = 1000
+
+    BRANDS = ("BMW", "Audi", "Mercedes", "VW", "Opel", "Ford", "Toyota", "Skoda", "Porsche", "Fiat",
+              "Renault", "Peugeot", "Volvo", "Honda", "Mazda", "Kia", "Hyundai", "Tesla", "Seat", "Dacia")
+    MODELS = ("A3", "Golf", "320d", "C 200", "Astra", "Focus", "Corolla", "Octavia", "911", "Panda",
+              "Clio", "208", "XC60", "Civic", "CX-5", "Ceed", "i30", "Model 3", "Leon", "Duster",
+              "Polo", "Passat", "Fiesta", "Yaris", "Kuga")
+    FIRST_NAMES = ("Anna", "Ben", "Clara", "David", "Emma", "Felix", "Greta", "Hannah", "Jonas", "Lea",
+                   "Leon", "Lina", "Lukas", "Marie", "Max", "Mia", "Noah", "Paul", "Sophie", "Tim")
+    LAST_NAMES = ("Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker",
+                  "Schulz", "Hoffmann", "Koch", "Richter", "Klein", "Wolf", "Neumann", "Schwarz",
+                  "Braun", "Zimmermann", "Hartmann", "Krüger")
+
+    def __init__(self, seed: int = 42, skew: float = 1.1, batch_size: int = None, distributions: dict = None):
+        """distributions: {"autos.ps": "normal:150:60", ...}"""
+        self.seed = seed
+        self.skew = skew
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.distributions = distributions or {}
+        self.engine = DBConnection.engine
+        self._passwords = None
+
+    def tables(self) -> dict:
+        """{table name: model} of the table models in table/"""
+        return {model.__tablename__: model for model in DatabaseMigration().import_table_models()}
+
+    def run(self, counts: dict) -> list:
+        """seed {table name: rows} in the given order, returns the result of each load"""
+        models = self.tables()
+        unknown = [name for name in counts if name not in models]
+        if unknown:
+            raise ValueError(f"unknown table(s): {', '.join(unknown)}, known: {', '.join(sorted(models))}")
+        return [self.load(models[name], count) for name, count in counts.items()]
+
+    def load(self, model, count: int) -> dict:
+        """insert `count` generated rows into the table of model"""
+        table = model.__table__
+        columns = self.__columns(table)
+        with self.engine.connect() as connection:
+            existing = connection.execute(select(func.count()).select_from(table)).scalar()
+        started = time.perf_counter()
+        batches = self.batches(model, count, start=existing)
+        if self.engine.url.get_backend_name() == "sqlite":
+            self.__load_sqlite(model, columns, batches, rebuild=count >= existing)
+        else:
+            statement = insert(table)
+            names = [column.name for column in columns]
+            for batch in batches:
+                # one transaction per batch, SQLAlchemy sends it as executemany / multi-row VALUES
+                with self.engine.begin() as connection:
+                    connection.execute(statement, [dict(zip(names, row)) for row in batch])
+        elapsed = time.perf_counter() - started
+        # running servers sharing the cache (SHARED_CACHE_PATH) see the new rows right away
+        TableVersion.bump(table.name)
+        return {"table": table.name, "rows": count, "seconds": round(elapsed, 2),
+                "rate": round(count / elapsed) if elapsed else 0}
+
+    def batches(self, model, count: int, start: int = 0):
+        """lists of row tuples (in the order of the generated columns), batch_size rows each"""
+        table = model.__table__
+        columns = self.__columns(table)
+        # one generator per column: the values do not depend on the batch size or the other columns.
+        # Built before the first batch, so an invalid distribution fails before anything is written
+        generators = [self.__generator(table, column, random.Random(f"{self.seed}:{table.name}.{column.name}"))
+                      for column in columns]
+
+        def rows():
+            done = 0
+            while done < count:
+                size = min(self.batch_size, count - done)
+                offset = start + done
+                yield list(zip(*[generate(offset, size) for generate in generators]))
+                done += size
+        return rows()
+
+    def passwords(self) -> list:
+        """bcrypt hashes of seed-password-0 ... seed-password-<PASSWORD_POOL - 1>"""
+        if self._passwords is None:
+            # hashing is the slow part of creating users, every row gets one of these instead
+            self._passwords = [bcrypt.hashpw(f"seed-password-{index}".encode(), bcrypt.gensalt()).decode()
+                               for index in range(max(1, self.PASSWORD_POOL))]
+        return self._passwords
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __columns(table) -> list:
+        """all columns except an autoincrement primary key"""
+        key = list(table.primary_key.columns)
+        generated = key[0] if len(key) == 1 and key[0].autoincrement in (True, "auto") and \
+            DataSeeder.__python_type(key[0]) is int else None
+        return [column for column in table.columns if column is not generated]
+
+    @staticmethod
+    def __python_type(column) -> type:
+        try:
+            return column.type.python_type
+        except NotImplementedError:
+            return str
+
+    def __generator(self, table, column, rng):
+        """function(offset, size) -> list of values for column"""
+        kind = self.__python_type(column)
+        spec = self.distributions.get(f"{table.name}.{column.name}")
+        if spec is None:
+            if column.name == "password" and kind is str:
+                pool = self.passwords()
+                return lambda offset, size: rng.choices(pool, k=size)
+            if column.name == "email" and kind is str:
+                return lambda offset, size: [f"user{number}@example.com" for number in range(offset + 1, offset + size + 1)]
+            if column.unique or column.primary_key:
+                spec = "sequence"
+            elif kind is str:
+                spec = f"zipf:{self.skew}"
+            elif kind is bool:
+                spec = "choice:true|false"
+            elif kind in (datetime.datetime, datetime.date):
+                spec = "uniform:0:365"
+            else:
+                spec = "uniform:1:1000"
+        name, _, arguments = spec.partition(":")
+        arguments = arguments.split(":") if arguments else []
+        try:
+            generate = self.__distribution(name, arguments, kind, table, column, rng)
+        except (ValueError, IndexError):
+            raise ValueError(f"invalid distribution for {table.name}.{column.name}: {spec}")
+        length = getattr(column.type, "length", None)
+        if kind is str and length:
+            return lambda offset, size: [value[:length] for value in generate(offset, size)]
+        return generate
+
+    def __distribution(self, name: str, arguments: list, kind: type, table, column, rng):
+        if name == "sequence":
+            if kind is str:
+                return lambda offset, size: [f"{column.name}-{number}" for number in range(offset + 1, offset + size + 1)]
+            return lambda offset, size: [kind(number) for number in range(offset + 1, offset + size + 1)]
+        if name == "choice":
+            values = [self.__convert(value, kind) for value in ":".join(arguments).split("|")]
+            return lambda offset, size: rng.choices(values, k=size)
+        if name == "zipf":
+            skew = float(arguments[0]) if arguments else self.skew
+            if kind is str:
+                population = self.__vocabulary(table, column, rng)
+            else:
+                population = [kind(rank) for rank in range(1, int(arguments[1]) + 1)] if len(arguments) > 1 \
+                    else [kind(rank) for rank in range(1, self.VOCABULARY_SIZE + 1)]
+            weights = list(itertools.accumulate(1 / rank ** skew for rank in range(1, len(population) + 1)))
+            return lambda offset, size: rng.choices(population, cum_weights=weights, k=size)
+        if name == "uniform":
+            low, high = float(arguments[0]), float(arguments[1])
+            if kind is int:
+                return lambda offset, size: [rng.randint(int(low), int(high)) for _ in range(size)]
+            if kind in (datetime.datetime, datetime.date):
+                return lambda offset, size: [self.__date(low + rng.random() * (high - low), kind) for _ in range(size)]
+            return lambda offset, size: [kind(rng.uniform(low, high)) for _ in range(size)]
+        if name == "normal":
+            mean, deviation = float(arguments[0]), float(arguments[1])
+            if kind is int:
+                return lambda offset, size: [round(rng.gauss(mean, deviation)) for _ in range(size)]
+            return lambda offset, size: [kind(rng.gauss(mean, deviation)) for _ in range(size)]
+        raise ValueError(name)
+
+    def __vocabulary(self, table, column, rng) -> list:
+        """distinct values of a string column, shuffled so the most common one depends on the seed"""
+        names = {column.name for column in table.columns}
+        if column.name == "name" and "email" in names:
+            vocabulary = [f"{first} {last}" for first in self.FIRST_NAMES for last in self.LAST_NAMES]
+        elif column.name == "name":
+            vocabulary = [f"{brand} {model}" for brand in self.BRANDS for model in self.MODELS]
+        else:
+            vocabulary = [f"{column.name}-{number}" for number in range(1, self.VOCABULARY_SIZE + 1)]
+        rng.shuffle(vocabulary)
+        return vocabulary
+
+    @staticmethod
+    def __convert(value: str, kind: type):
+        if kind is bool:
+            return value.lower() in ("1", "true", "yes")
+        if kind in (datetime.datetime, datetime.date):
+            return kind.fromisoformat(value)
+        return kind(value)
+
+    @classmethod
+    def __date(cls, days: float, kind: type):
+        value = cls.EPOCH + datetime.timedelta(days=days)
+        return value.date() if kind is datetime.date else value
+
+    def __load_sqlite(self, model, columns: list, batches, rebuild: bool) -> None:
+        """
+        executemany on the driver connection, one transaction per batch, with synchronous=OFF and
+        an in-memory journal while loading. When rebuild is set (at least as many new rows as
+        existing ones) the search index triggers are dropped during the load and the index is
+        rebuilt once afterwards.
+        """
+        table = model.__table__
+        statement = str(insert(table).compile(dialect=self.engine.dialect, column_keys=[column.name for column in columns]))
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+            journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+            cache_size = cursor.execute("PRAGMA cache_size").fetchone()[0]
+            searchable = rebuild and getattr(model, "__searchable__", None) and cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (SearchIndex.name(model),)).fetchone()
+            cursor.execute("PRAGMA synchronous = OFF")
+            cursor.execute("PRAGMA journal_mode = MEMORY")
+            cursor.execute("PRAGMA cache_size = -262144")
+            try:
+                if searchable:
+                    for suffix in ("ai", "ad", "au"):
+                        cursor.execute(f"DROP TRIGGER IF EXISTS {SearchIndex.name(model)}_{suffix}")
+                    connection.commit()
+                for batch in batches:
+                    cursor.executemany(statement, batch)
+                    connection.commit()
+            except self.engine.dialect.loaded_dbapi.Error as e:
+                # same exception types as the other path (IntegrityError, OperationalError, ...)
+                raise DBAPIError.instance(statement, None, e, self.engine.dialect.loaded_dbapi.Error)
+            finally:
+                connection.rollback()
+                if searchable:
+                    print(f"📝 Rebuilding search index: {SearchIndex.name(model)}")
+                    for ddl in SearchIndex.statements(model):
+                        cursor.execute(ddl)
+                    cursor.execute(SearchIndex.rebuild(model))
+                    connection.commit()
+                cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+                cursor.execute(f"PRAGMA synchronous = {synchronous}")
+                cursor.execute(f"PRAGMA cache_size = {cache_size}")
+        finally:
+            connection.close()
@@ -12,12 +12,15 @@ if project_root not in sys.path:
 
 from typing import List, Type, Dict
 from table.DBConnection import Base, DBConnection
+from helper.SearchIndex import SearchIndex
 
 class DatabaseMigration:
     def __init__(self):
         self.engine = DBConnection.engine
         self.migration_summary = {
             'created_tables': [],
+            'created_indexes': [],
+            'search_indexes': [],
             'new_columns': {},
             'removed_columns': {}
         }
@@ -96,6 +99,38 @@ class DatabaseMigration:
             print(f"❌ Error during migration: {e}")
             raise
     
+    def create_missing_indexes(self) -> None:
+        """Create indexes declared on the models (index=True) that existing tables do not have yet."""
+        existing_tables = self.get_all_tables()
+        with self.engine.connect() as conn:
+            existing_indexes = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type='index'"))}
+        for model in self.import_table_models():
+            if model.__tablename__ not in existing_tables:
+                continue  # created together with its table
+            for index in model.__table__.indexes:
+                if index.name not in existing_indexes:
+                    print(f"📝 Creating index: {index.name}")
+                    index.create(self.engine)
+                    self.migration_summary['created_indexes'].append(index.name)
+
+    def create_search_indexes(self) -> None:
+        """Create the FTS5 table and sync triggers for models declaring __searchable__ columns."""
+        existing_tables = self.get_all_tables()
+        for model in self.import_table_models():
+            if not getattr(model, '__searchable__', None):
+                continue
+            name = SearchIndex.name(model)
+            try:
+                with self.engine.begin() as conn:
+                    for statement in SearchIndex.statements(model):
+                        conn.execute(text(statement))
+                    if name not in existing_tables:
+                        print(f"📝 Creating search index: {name}")
+                        conn.execute(text(SearchIndex.rebuild(model)))
+                        self.migration_summary['search_indexes'].append(name)
+            except SQLAlchemyError as e:
+                print(f"❌ Error creating search index {name}: {e}")
+
     def check_column_changes(self) -> None:
         """Check for any column changes in existing tables."""
         table_models = self.import_table_models()
@@ -133,6 +168,16 @@ class DatabaseMigration:
             for table in self.migration_summary['created_tables']:
                 print(f"  ✓ {table}")
         
+        if self.migration_summary['created_indexes']:
+            print("\n🔎 Created Indexes:")
+            for index in self.migration_summary['created_indexes']:
+                print(f"  ✓ {index}")
+
+        if self.migration_summary['search_indexes']:
+            print("\n🔍 Search Indexes:")
+            for index in self.migration_summary['search_indexes']:
+                print(f"  ✓ {index}")
+
         if self.migration_summary['new_columns']:
             print("\n📋 New Columns:")
             for table, columns in self.migration_summary['new_columns'].items():
@@ -154,6 +199,8 @@ class DatabaseMigration:
         """Run the complete migration process."""
         print("🚀 Starting database migration...")
         self.create_missing_tables()
+        self.create_missing_indexes()
+        self.create_search_indexes()
         self.check_column_changes()
         self.print_migration_summary()
         print("🚀 Thanks from Ali Khorsandfard for using this micro python Framework, Enjoy!")
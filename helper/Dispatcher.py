@@ -0,0 +1,123 @@
+import importlib
+import inspect
+from pathlib import Path
+from typing import Any, Optional
+from helper.Response import Response
+from helper.HttpError import HttpError
+from helper.Middleware import Middleware
+from helper.Request import Request
+
+
+class Dispatcher:
+    """
+    Controller lookup and invocation, shared by Application and the BatchController
+
+    Controller classes are resolved once and cached, each route (controller and HTTP method) is
+    compiled once together with its middleware (see Middleware). Controller methods may be written as
+    `get(self, data)` or `get(self, data, headers)`, the dispatcher passes the headers only to
+    methods that accept them.
+    """
+    METHOD_MAP = {
+        "POST": "post",
+        "PUT": "put",
+        "DELETE": "destroy",
+        "GET": "get",
+        "OPTIONS": "options"
+    }
+
+    _classes = {}
+    # (controller name, HTTP method) -> compiled handler, see route()
+    _routes = {}
+    _takes_headers = {}
+
+    @staticmethod
+    def controller_name(segment: str) -> str:
+        return segment.capitalize() + "Controller"
+
+    @classmethod
+    def controller_class(cls, controller_name: str):
+        if controller_name not in cls._classes:
+            controller_class = None
+            if controller_name.isidentifier():
+                try:
+                    module = importlib.import_module(f'controller.{controller_name}')
+                    controller_class = getattr(module, controller_name, None)
+                except ImportError:
+                    controller_class = None
+            cls._classes[controller_name] = controller_class
+        return cls._classes[controller_name]
+
+    @classmethod
+    def create_instance(cls, controller_name: str):
+        controller_class = cls.controller_class(controller_name)
+        return controller_class() if controller_class else None
+
+    @classmethod
+    def create_method(cls, controller_instance, method_HTTP: str) -> Optional[Any]:
+        return getattr(controller_instance, cls.METHOD_MAP.get(method_HTTP, "get"), None)
+
+    @classmethod
+    def invoke(cls, method_to_call, data, headers) -> Response:
+        function = getattr(method_to_call, "__func__", method_to_call)
+        takes_headers = cls._takes_headers.get(function)
+        if takes_headers is None:
+            try:
+                parameters = inspect.signature(method_to_call).parameters.values()
+                takes_headers = sum(1 for p in parameters if p.kind != p.VAR_KEYWORD) >= 2
+            except (TypeError, ValueError):
+                takes_headers = True
+            cls._takes_headers[function] = takes_headers
+        if takes_headers:
+            return Response.of(method_to_call(data, headers))
+        return Response.of(method_to_call(data))
+
+    @classmethod
+    def route(cls, controller_name: str, method_HTTP: str):
+        """
+        the compiled handler(request) -> Response of a controller method with its middleware,
+        or a 404 Response when the controller or the method does not exist
+        """
+        handler = cls._routes.get((controller_name, method_HTTP))
+        if handler is not None:
+            return handler
+        controller_class = cls.controller_class(controller_name)
+        if not controller_class:
+            return Response.not_found(f"Controller '{controller_name}' not found.")
+        method_name = cls.METHOD_MAP.get(method_HTTP, "get")
+        if not callable(getattr(controller_class, method_name, None)):
+            return Response.not_found(f"Method '{method_name}' not found in '{controller_name}'.")
+
+        def endpoint(request):
+            controller = controller_class()
+            controller.client_address = request.client_address
+            return cls.invoke(getattr(controller, method_name), request.data, request.headers)
+        handler = Middleware.compile(controller_name, controller_class, method_HTTP, method_name, endpoint)
+        cls._routes[(controller_name, method_HTTP)] = handler
+        return handler
+
+    @classmethod
+    def compile_routes(cls) -> int:
+        """compile the routes of all controllers in controller/ up front, returns their number"""
+        compiled = 0
+        for file in sorted((Path(__file__).parent.parent / "controller").glob("*Controller.py")):
+            for method_HTTP in cls.METHOD_MAP:
+                if not isinstance(cls.route(file.stem, method_HTTP), Response):
+                    compiled += 1
+        return compiled
+
+    @classmethod
+    def call(cls, method_HTTP: str, controller_name: str, data, headers, client_address: str = "") -> Response:
+        """
+        run one controller method as a nested request (batch) and always return a Response,
+        also for lookup errors. The route's middleware applies, see Request for what is skipped.
+        client_address is the one of the outer request, rate limits of anonymous callers use it.
+        """
+        handler = cls.route(controller_name, method_HTTP)
+        if isinstance(handler, Response):
+            return handler
+        try:
+            return handler(Request(method_HTTP, None, headers, data, client_address, nested=True))
+        except HttpError as e:
+            return e.response()
+        except Exception as e:
+            return Response.internal_error(str(e))
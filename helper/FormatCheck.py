@@ -1,7 +1,9 @@
 import re
  
 class FormatCheck:
-   
+    # compiled once, not on every call
+    EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-z]+$")
+
     @staticmethod
     def email(email:str) -> bool:
         """_summary_
@@ -10,8 +12,7 @@ class FormatCheck:
         Returns:
             bool: _description_
         """
-        pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-z]+$"
-        return bool(re.match(pattern, email))
+        return FormatCheck.EMAIL_PATTERN.match(email) is not None
     
     @staticmethod 
     def minimumLength(input_string: str , min_length:int)->bool:
@@ -0,0 +1,138 @@
+import os
+import queue
+import threading
+import time
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError
+from table.DBConnection import DBConnection
+from helper.TableVersion import TableVersion
+
+class GroupCommit:
+    """
+    Group commit for single-row inserts (GROUP_COMMIT=true)
+
+    Request threads queue their row and wait. One writer thread collects the queued rows for
+    at most GROUP_COMMIT_DELAY_MS or GROUP_COMMIT_MAX_ROWS rows and inserts them in one
+    transaction, every row in its own SAVEPOINT so a failing row is rolled back alone and
+    reported to its caller. Callers are answered only after the shared COMMIT, so durability
+    is the same as with one transaction per row, but there is one fsync per batch.
+    """
+    ENABLED = os.getenv("GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+    MAX_DELAY = float(os.getenv("GROUP_COMMIT_DELAY_MS", 5)) / 1000
+    MAX_ROWS = int(os.getenv("GROUP_COMMIT_MAX_ROWS", 200))
+    TIMEOUT = float(os.getenv("GROUP_COMMIT_TIMEOUT", 30))
+
+    _queue = queue.Queue()
+    _writer = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def insert(cls, table, values: dict):
+        """
+        queue one row of the table class and wait for the shared commit
+        returns the primary key, raises the SQLAlchemyError of the row like a direct insert would
+        """
+        cls.__start()
+        pending = _Pending(table, values)
+        cls._queue.put(pending)
+        if not pending.done.wait(cls.TIMEOUT):
+            with cls._lock:
+                cancelled = not pending.taken
+                pending.cancelled = cancelled
+            if cancelled:
+                # still queued, the writer drops it: the row is never written
+                raise TimeoutError("timed out waiting for the group commit")
+            # the writer is inserting it already, only its outcome is a true answer
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.primary_key
+
+#--------------------Private Methods ---------------------------------------
+
+    @classmethod
+    def __start(cls):
+        if cls._writer is None:
+            with cls._lock:
+                if cls._writer is None:
+                    cls._writer = threading.Thread(target=cls.__run, name="group-commit", daemon=True)
+                    cls._writer.start()
+
+    @classmethod
+    def __run(cls):
+        while True:
+            first = cls._queue.get()
+            if not cls.__take(first):
+                continue
+            batch = [first]
+            deadline = first.queued + cls.MAX_DELAY
+            while len(batch) < cls.MAX_ROWS:
+                timeout = deadline - time.monotonic()
+                try:
+                    pending = cls._queue.get(timeout=timeout) if timeout > 0 else cls._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if cls.__take(pending):
+                    batch.append(pending)
+            try:
+                cls.__commit(batch)
+            except Exception as e:
+                # the writer must survive, waiting callers get the error
+                for pending in batch:
+                    if not pending.done.is_set():
+                        pending.primary_key, pending.error = None, e
+                        pending.done.set()
+
+    @classmethod
+    def __take(cls, pending) -> bool:
+        """claim a queued row for the batch, False if its caller gave up waiting"""
+        with cls._lock:
+            if pending.cancelled:
+                return False
+            pending.taken = True
+            return True
+
+    @classmethod
+    def __commit(cls, batch: list):
+        written = []
+        try:
+            with DBConnection.engine.connect() as connection:
+                with connection.begin():
+                    if connection.dialect.name == "sqlite":
+                        # pysqlite only sends BEGIN before the first INSERT, the first SAVEPOINT
+                        # would open the transaction and its RELEASE would commit it
+                        connection.exec_driver_sql("BEGIN")
+                    for pending in batch:
+                        savepoint = connection.begin_nested()
+                        try:
+                            result = connection.execute(insert(pending.table.__table__).values(pending.values))
+                            savepoint.commit()
+                            pending.primary_key = result.inserted_primary_key[0]
+                            written.append(pending)
+                        except SQLAlchemyError as e:
+                            savepoint.rollback()
+                            pending.error = e
+        except SQLAlchemyError as e:
+            for pending in written:
+                pending.primary_key = None
+                pending.error = e
+            written = []
+        for table in {pending.table.__tablename__ for pending in written}:
+            TableVersion.bump(table)
+        for pending in batch:
+            pending.done.set()
+
+
+class _Pending:
+    __slots__ = ("table", "values", "queued", "done", "primary_key", "error", "taken", "cancelled")
+
+    def __init__(self, table, values: dict):
+        self.table = table
+        self.values = values
+        self.queued = time.monotonic()
+        self.done = threading.Event()
+        self.primary_key = None
+        self.error = None
+        # taken by the writer / given up by the caller, at most one of both, under GroupCommit._lock
+        self.taken = False
+        self.cancelled = False
@@ -0,0 +1,43 @@
+import hashlib
+from helper.TableVersion import TableVersion
+
+
+class HttpCache:
+    """
+    Helpers for conditional GET (ETag / If-None-Match) and Cache-Control headers
+    """
+
+    @staticmethod
+    def etag(body: bytes) -> str:
+        """strong ETag computed from the serialized response body"""
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    @staticmethod
+    def version_etag(tables, *parts: str) -> str:
+        """
+        cheap ETag from the write counters of the tables a response is built from
+        parts (path, auth scope, ...) keep the tag specific to one representation
+        """
+        key = TableVersion.token(*tables) + "|" + "|".join(part or "" for part in parts)
+        return '"v-' + hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+    @staticmethod
+    def matches(if_none_match: str, etag: str) -> bool:
+        """weak comparison as required for If-None-Match (RFC 9110 13.1.2)"""
+        if not if_none_match or not etag:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        etag = HttpCache.__opaque(etag)
+        return any(HttpCache.__opaque(tag) == etag for tag in if_none_match.split(","))
+
+    @staticmethod
+    def cache_control(max_age) -> str:
+        if not max_age:
+            return "private, no-cache"
+        return f"private, max-age={int(max_age)}"
+
+    @staticmethod
+    def __opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
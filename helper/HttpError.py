@@ -0,0 +1,21 @@
+from helper.Response import Response
+
+class HttpError(Exception):
+    """
+    Raised while reading or checking a request to answer it directly with an error status,
+    e.g. 413 for a body that is too large or 415 for an unknown Content-Encoding
+    """
+    def __init__(self, status_code: int, message: str, headers: dict = None, static: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.headers = headers or {}
+        # constant message: the encoded response body can be cached (Response.static)
+        self.static = static
+        # NDJSON line the error belongs to, set by RequestBody.records()
+        self.line = None
+
+    def response(self) -> Response:
+        if self.static:
+            return Response.static(self.status_code, self.message)
+        return Response(self.status_code, self.message)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import threading
+from interface.IIdempotencyStore import IIdempotencyStore
+from helper.MemoryIdempotencyStore import MemoryIdempotencyStore
+from helper.SqliteIdempotencyStore import SqliteIdempotencyStore
+from helper.Response import Response
+
+class Idempotency:
+    """
+    Idempotency-Key support for POST and PUT
+
+    The first response per key and client is stored (IDEMPOTENCY_TTL seconds, at most
+    IDEMPOTENCY_MAX_KEYS keys). A retry with the same key gets the stored response without
+    running the controller again, marked with `Idempotent-Replayed: true`. A duplicate that
+    arrives while the first request is still running waits for it. Server errors (5xx) are not
+    stored, a retry after one runs again. Reusing a key for a different body is answered with 422.
+
+    Records are kept in memory, set IDEMPOTENCY_DB to an SQLite file to keep them across restarts.
+    """
+    METHODS = ("POST", "PUT")
+    HEADER = "Idempotency-Key"
+    MAX_KEY_LENGTH = 255
+    TTL = float(os.getenv("IDEMPOTENCY_TTL", 86400))
+    MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", 10000))
+    WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 30))
+
+    store: IIdempotencyStore = (SqliteIdempotencyStore(os.getenv("IDEMPOTENCY_DB"), MAX_KEYS)
+                                if os.getenv("IDEMPOTENCY_DB") else MemoryIdempotencyStore(MAX_KEYS))
+    _in_flight = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def key(client_key: str, method_HTTP: str, path: str, idempotency_key: str) -> str:
+        return f"{client_key}:{method_HTTP}:{path}:{idempotency_key}"
+
+    @staticmethod
+    def fingerprint(data) -> None|str:
+        """hash of the request body, None for bodies that can not be compared (streams)"""
+        if not isinstance(data, (dict, list)):
+            return None
+        encoded = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    @classmethod
+    def run(cls, key: str, fingerprint: None|str, function) -> Response:
+        """the stored response for key, or the response of function() which is stored"""
+        while True:
+            with cls._lock:
+                call = cls._in_flight.get(key)
+                if call is None:
+                    # checked under the lock, the first request stores before it leaves _in_flight
+                    record = cls.store.get(key)
+                    if record is not None:
+                        return cls.__replay(record, fingerprint)
+                    call = _InFlight()
+                    cls._in_flight[key] = call
+                    break
+            if not call.done.wait(cls.WAIT_TIMEOUT):
+                return Response.static(409, "A request with this Idempotency-Key is still in progress")
+            if call.record is not None:
+                return cls.__replay(call.record, fingerprint)
+            # the first request failed without a stored response, this one runs itself
+
+        try:
+            response = function()
+            if response.status_code < 500:
+                call.record = {"fingerprint": fingerprint, "status": response.status_code,
+                               "body": response.body, "headers": response.headers}
+                cls.store.put(key, call.record, cls.TTL)
+            return response
+        finally:
+            with cls._lock:
+                del cls._in_flight[key]
+            call.done.set()
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __replay(record: dict, fingerprint: None|str) -> Response:
+        if record["fingerprint"] != fingerprint:
+            return Response.static(422, "Idempotency-Key was already used for a different request")
+        headers = {**(record["headers"] or {}), "Idempotent-Replayed": "true"}
+        return Response(record["status"], None, headers, body=record["body"])
+
+
+class _InFlight:
+    __slots__ = ("done", "record")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.record = None
@@ -0,0 +1,106 @@
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from helper.Application import Application
+from helper.Compression import Compression
+from helper.TrafficReplay import TrafficReplay
+
+class LocalClient:
+    """
+    In-process client: requests go through Application like a real one, without a socket
+
+    Routing, authentication, rate limits, caching, compression and serialization are exactly
+    those of HttpHandler, only the network is left out, so measurements show the cost of
+    controllers and models instead of TCP noise. A client can be shared by many threads.
+
+        client = LocalClient(token=token)
+        client.get("/auto?ps__gte=100")     -> {"status_code": 200, "headers": {...}, "body": {...}}
+        client.post("/auto", {"name": "Golf", "ps": 90})
+        client.bench("GET", "/auto/count", requests=10000, workers=8)
+    """
+    def __init__(self, token: str = None, headers: dict = None, client_address: str = "127.0.0.1"):
+        self.token = token
+        self.headers = headers or {}
+        self.client_address = client_address
+
+    def request(self, method_HTTP: str, path: str, body=None, headers: dict = None) -> dict:
+        """
+        body: dict or list (sent as JSON), bytes or str (sent as is, set Content-Type yourself)
+        returns status code, response headers and the decoded (decompressed, parsed JSON) body
+        """
+        pairs = {**self.headers, **(headers or {})}
+        if self.token and "Authorization" not in pairs:
+            pairs["Authorization"] = f"Bearer {self.token}"
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            pairs.setdefault("Content-Type", "application/json")
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        body = body or b""
+        if body or method_HTTP in ("POST", "PUT", "DELETE"):
+            pairs["Content-Length"] = str(len(body))
+
+        application = Application(method_HTTP, path, Application.request_headers(pairs.items()),
+                                  io.BytesIO(body), self.client_address)
+        status_code, response_headers, content = application.handle()
+        response_headers = dict(response_headers)
+        encoding = response_headers.get("Content-Encoding")
+        if encoding and content:
+            content = Compression.decompress(content, encoding)
+        return {"status_code": status_code, "headers": response_headers, "body": self.__decode(content)}
+
+    def get(self, path: str, headers: dict = None) -> dict:
+        return self.request("GET", path, headers=headers)
+
+    def post(self, path: str, body=None, headers: dict = None) -> dict:
+        return self.request("POST", path, body, headers)
+
+    def put(self, path: str, body=None, headers: dict = None) -> dict:
+        return self.request("PUT", path, body, headers)
+
+    def delete(self, path: str, body=None, headers: dict = None) -> dict:
+        return self.request("DELETE", path, body, headers)
+
+    def bench(self, method_HTTP: str, path: str, body=None, headers: dict = None, requests: int = 1000, workers: int = 1) -> dict:
+        """
+        send the same request `requests` times from `workers` threads
+        {"requests", "seconds", "rate", "errors", "status": {code: count}, "latency_ms": {p50, p90, p99, max}}
+        """
+        latencies, statuses = [], {}
+        lock = threading.Lock()
+        counter = iter(range(requests))
+
+        def work():
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        return
+                start = time.perf_counter()
+                status_code = self.request(method_HTTP, path, body, headers)["status_code"]
+                latency = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(latency)
+                    statuses[status_code] = statuses.get(status_code, 0) + 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(work) for _ in range(workers)]:
+                future.result()
+        elapsed = time.perf_counter() - started
+        return {"requests": len(latencies), "seconds": round(elapsed, 3),
+                "rate": round(len(latencies) / elapsed, 1) if elapsed else 0,
+                "errors": sum(count for status_code, count in statuses.items() if status_code >= 500),
+                "status": dict(sorted(statuses.items())), "latency_ms": TrafficReplay.percentiles(latencies)}
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __decode(content: bytes):
+        if not content:
+            return None
+        try:
+            return json.loads(content.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return content
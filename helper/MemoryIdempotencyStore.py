@@ -0,0 +1,36 @@
+import threading
+import time
+from collections import OrderedDict
+from interface.IIdempotencyStore import IIdempotencyStore
+
+
+class MemoryIdempotencyStore(IIdempotencyStore):
+    """
+    Records in insertion order, guarded by a lock. Expired records are dropped on access and
+    from the old end, beyond `max_keys` the oldest records are dropped.
+    """
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._records = OrderedDict()  # key -> (expires, record)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> None|dict:
+        with self._lock:
+            entry = self._records.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._records[key]
+                return None
+            return entry[1]
+
+    def put(self, key: str, record: dict, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._records.pop(key, None)
+            self._records[key] = (now + ttl, record)
+            while self._records:
+                oldest_key, (expires, _) = next(iter(self._records.items()))
+                if expires > now and len(self._records) <= self.max_keys:
+                    break
+                del self._records[oldest_key]
@@ -0,0 +1,34 @@
+import threading
+import time
+from interface.IRateLimitStore import IRateLimitStore
+
+
+class MemoryRateLimitStore(IRateLimitStore):
+    """
+    Token buckets in a dict, guarded by a lock. A bucket that has refilled completely carries
+    no state, such buckets are dropped when the store grows past `max_keys`.
+    """
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> (tokens, updated, full_at)
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + (now - bucket[1]) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if len(self._buckets) > self.max_keys:
+                self.__purge(now)
+            return wait
+
+    def __purge(self, now: float) -> None:
+        full = [key for key, bucket in self._buckets.items() if bucket[2] <= now]
+        for key in full:
+            del self._buckets[key]
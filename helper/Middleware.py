@@ -0,0 +1,258 @@
+import math
+import time
+from urllib.parse import urlparse
+from helper.AuthController import AuthController
+from helper.AuthenticatedHeaders import AuthenticatedHeaders
+from helper.Compression import Compression
+from helper.HttpCache import HttpCache
+from helper.HttpError import HttpError
+from helper.Idempotency import Idempotency
+from helper.RateLimiter import RateLimiter
+from helper.Response import Response
+from helper.SingleFlight import SingleFlight
+from helper.TableVersion import TableVersion
+
+class Middleware:
+    """
+    Cross-cutting stages around the controller methods, compiled once per route
+
+    Controllers declare the stages they want, for all methods or per method:
+
+        middleware = ("auth",) + Middleware.DEFAULT
+        middleware = {"get": Middleware.DEFAULT + ("auth",), "post": ("auth", "admin")}
+
+    Controllers without a declaration get DEFAULT, a method missing from the dict gets the
+    entry "*" or DEFAULT. The stages always nest in the order of ORDER, whatever the order of the
+    declaration:
+
+        timing          Server-Timing header with the time spent inside the stages
+        rate_limit      token bucket (429) and concurrency limit (503), see RateLimiter
+        compression     negotiates the Content-Encoding of the response
+        auth            a valid token, the controller gets AuthenticatedHeaders with the claims
+        admin           role "admin", implies auth
+        cache           conditional GET: ETag, If-None-Match -> 304, Cache-Control
+        single_flight   identical concurrent GETs share one controller call
+        idempotency     Idempotency-Key for POST and PUT
+
+    compile() builds one nested function per route (controller + HTTP method). Stages that can
+    not apply to the route, e.g. cache for POST or rate_limit without any configured limit, are
+    left out, so a route pays only for what it uses and a route without middleware is a direct
+    call of the controller method.
+    """
+    ORDER = ("timing", "rate_limit", "compression", "auth", "admin", "cache", "single_flight", "idempotency")
+    DEFAULT = ("rate_limit", "compression", "cache", "single_flight", "idempotency")
+    BODY_METHODS = ("POST", "PUT", "DELETE")
+    # stages that need the request data, the body is read right before them
+    AFTER_BODY = ("cache", "single_flight", "idempotency")
+
+    @classmethod
+    def declared(cls, controller_class, method_name: str) -> tuple:
+        """the stage names a controller declares for one of its methods, in ORDER"""
+        middleware = getattr(controller_class, "middleware", None)
+        if middleware is None:
+            names = cls.DEFAULT
+        elif isinstance(middleware, dict):
+            names = middleware.get(method_name, middleware.get("*", cls.DEFAULT))
+        else:
+            names = middleware
+        unknown = [name for name in names if name not in cls.ORDER]
+        if unknown:
+            raise ValueError(f"Unknown middleware {', '.join(unknown)} in {controller_class.__name__}.{method_name}")
+        if "admin" in names:
+            names = (*names, "auth")
+        return tuple(name for name in cls.ORDER if name in names)
+
+    @classmethod
+    def compile(cls, controller_name: str, controller_class, method_HTTP: str, method_name: str, endpoint):
+        """
+        endpoint(request) -> Response runs the controller method, the result is the same
+        function wrapped by the stages of the route
+        """
+        stages = {
+            "timing": cls.__timing,
+            "rate_limit": cls.__rate_limit,
+            "compression": cls.__compression,
+            "auth": cls.__auth,
+            "admin": cls.__admin,
+            "cache": cls.__cache,
+            "single_flight": cls.__single_flight,
+            "idempotency": cls.__idempotency,
+        }
+        names = cls.declared(controller_class, method_name)
+        handler = endpoint
+        for name in reversed([name for name in names if name in cls.AFTER_BODY]):
+            handler = stages[name](handler, controller_name, controller_class, method_HTTP, names)
+        if method_HTTP in cls.BODY_METHODS:
+            # the body is read inside auth and rate_limit: rejected requests are never read
+            handler = cls.__body(handler, controller_class)
+        for name in reversed([name for name in names if name not in cls.AFTER_BODY]):
+            handler = stages[name](handler, controller_name, controller_class, method_HTTP, names)
+        return handler
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __body(handler, controller_class):
+        max_body_size = getattr(controller_class, "max_body_size", None)
+
+        def body(request):
+            request.load(max_body_size)
+            return handler(request)
+        return body
+
+    @staticmethod
+    def __timing(handler, controller_name, controller_class, method_HTTP, names):
+        def timing(request):
+            start = time.perf_counter()
+            response = handler(request)
+            request.response_headers["Server-Timing"] = f"app;dur={(time.perf_counter() - start) * 1000:.3f}"
+            return response
+        return timing
+
+    @staticmethod
+    def __rate_limit(handler, controller_name, controller_class, method_HTTP, names):
+        buckets = bool(getattr(controller_class, "rate_limit", None)) or RateLimiter.RATE > 0
+        slots = bool(getattr(controller_class, "max_concurrency", None)) or RateLimiter.MAX_CONCURRENCY > 0
+        if not buckets and not slots:
+            return handler
+
+        def rate_limit(request):
+            # shed load before the body is read or any work is done. Every sub-request of a batch
+            # costs a token, a batch is no way around the limit
+            if buckets:
+                if getattr(request.headers, "claims", None) is None:
+                    # the token is verified once per request, auth and the controller reuse the result
+                    request.headers = AuthenticatedHeaders(request.headers, RateLimiter.claims(request.headers))
+                retry_after = RateLimiter.check(request.headers, request.client_address, controller_name, controller_class)
+                if retry_after:
+                    raise HttpError(429, "Too many requests", {"Retry-After": str(math.ceil(retry_after))}, static=True)
+            if not slots or request.nested:
+                # a sub-request runs inside the slot its batch already holds
+                return handler(request)
+            if not RateLimiter.acquire(controller_name, controller_class):
+                raise HttpError(503, "Server is busy, try again later", {"Retry-After": "1"}, static=True)
+            try:
+                return handler(request)
+            finally:
+                RateLimiter.release(controller_name)
+        return rate_limit
+
+    @staticmethod
+    def __compression(handler, controller_name, controller_class, method_HTTP, names):
+        if Compression.LEVEL <= 0:
+            return handler
+
+        def compression(request):
+            request.encoding = Compression.negotiate(request.headers.get("Accept-Encoding"))
+            return handler(request)
+        return compression
+
+    @staticmethod
+    def __auth(handler, controller_name, controller_class, method_HTTP, names):
+        def auth(request):
+            decoded = AuthController().authenticate(request.headers)
+            if isinstance(decoded, dict) and "status_code" in decoded:
+                # the constant messages of AuthController, their encoded bodies are reused
+                return Response.static(decoded["status_code"], decoded["message"])
+            if getattr(request.headers, "claims", None) is None:
+                # the controller's own authenticate() trusts the claims instead of decoding again
+                request.headers = AuthenticatedHeaders(request.headers, decoded)
+            return handler(request)
+        return auth
+
+    @staticmethod
+    def __admin(handler, controller_name, controller_class, method_HTTP, names):
+        def admin(request):
+            if request.headers.claims.get("role") != "admin":
+                return Response.static(403, "Insufficient permissions")
+            return handler(request)
+        return admin
+
+    @staticmethod
+    def __cache(handler, controller_name, controller_class, method_HTTP, names):
+        """
+        conditional GET. Controllers can declare `cache_max_age` (Cache-Control) and `cache_tables`.
+        With `cache_tables` the ETag is derived from the table write counters, so an unchanged
+        resource is answered with 304 before the controller queries or serializes anything. That
+        needs counters that see every write (TableVersion.trusted()), otherwise the ETag is a hash
+        of the body.
+        """
+        if method_HTTP != "GET":
+            return handler
+        cache_tables = getattr(controller_class, "cache_tables", None)
+        cache_max_age = getattr(controller_class, "cache_max_age", None)
+        # a 304 must not be cheaper than the auth check of the real request
+        authenticate = "auth" not in names and issubclass(controller_class, AuthController)
+
+        def not_modified(request, etag):
+            request.response_headers["ETag"] = etag
+            if cache_max_age is not None:
+                request.response_headers["Cache-Control"] = HttpCache.cache_control(cache_max_age)
+            return Response(304, None, body=b"")
+
+        def cache(request):
+            if request.nested:
+                return handler(request)
+            if_none_match = request.headers.get("If-None-Match")
+            version = None
+            if cache_tables and TableVersion.trusted():
+                version = HttpCache.version_etag(cache_tables, request.path, request.headers.get("Authorization"))
+                # the body size is not known yet: the client holds the compressed or the plain variant
+                candidates = (Compression.etag(version, request.encoding, Compression.MIN_SIZE), version)
+                etag = next((tag for tag in candidates if HttpCache.matches(if_none_match, tag)), None)
+                if etag:
+                    if authenticate:
+                        decoded = controller_class().authenticate(request.headers)
+                        if isinstance(decoded, Response) or isinstance(decoded, dict) and "status_code" in decoded:
+                            return Response.of(decoded)
+                    return not_modified(request, etag)
+
+            response = handler(request)
+            if response.status_code != 200:
+                return response
+            etag = Compression.etag(version or HttpCache.etag(response.body), request.encoding, len(response.body))
+            if HttpCache.matches(if_none_match, etag):
+                return not_modified(request, etag)
+            request.response_headers["ETag"] = etag
+            if cache_max_age is not None:
+                request.response_headers["Cache-Control"] = HttpCache.cache_control(cache_max_age)
+            return response
+        return cache
+
+    @staticmethod
+    def __single_flight(handler, controller_name, controller_class, method_HTTP, names):
+        """
+        concurrent identical reads (same controller, params and Authorization) share one execution.
+        Controllers opt out with `single_flight = False`. With `cache_tables` the table versions are
+        part of the key, a read never joins one that started before a write.
+        """
+        if method_HTTP != "GET" or not SingleFlight.ENABLED or not getattr(controller_class, "single_flight", True):
+            return handler
+        cache_tables = getattr(controller_class, "cache_tables", None)
+
+        def single_flight(request):
+            key = SingleFlight.key(controller_name, request.data, request.headers.get("Authorization"),
+                                   TableVersion.token(*cache_tables) if cache_tables else None)
+            return SingleFlight.do(key, lambda: handler(request))
+        return single_flight
+
+    @staticmethod
+    def __idempotency(handler, controller_name, controller_class, method_HTTP, names):
+        """a retry with the same Idempotency-Key gets the first response instead of running again"""
+        if method_HTTP not in Idempotency.METHODS:
+            return handler
+
+        def idempotency(request):
+            idempotency_key = request.headers.get(Idempotency.HEADER)
+            if not idempotency_key or request.nested:
+                return handler(request)
+            if len(idempotency_key) > Idempotency.MAX_KEY_LENGTH:
+                return Response.static(400, f"{Idempotency.HEADER} must not be longer than {Idempotency.MAX_KEY_LENGTH} characters")
+            fingerprint = Idempotency.fingerprint(request.data)
+            if fingerprint is None:
+                # streamed bodies are read by the controller, they can not be compared or replayed
+                return handler(request)
+            key = Idempotency.key(RateLimiter.client_key(request.headers, request.client_address),
+                                  method_HTTP, urlparse(request.path).path, idempotency_key)
+            return Idempotency.run(key, fingerprint, lambda: handler(request))
+        return idempotency
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from interface.ICache import ICache
+from helper.MemoryCache import MemoryCache
+from helper.SharedMemoryCache import SharedMemoryCache
+from helper.TableVersion import TableVersion
+
+class QueryCache:
+    """
+    Result cache for model reads (list, filtered queries, counts, aggregates)
+
+    Entries are keyed by model, method and normalized parameters and remember the write counters
+    of their tables (TableVersion) from before the query ran. Every write through the model layer
+    bumps the counter, after that the entry no longer matches and the next read queries again and
+    replaces it. Old entries are also evicted by the LRU and the memory budget of the backend.
+
+    With QUERY_CACHE_STALE_WHILE_REVALIDATE=true an outdated entry is still returned while one
+    background refresh per key replaces it.
+
+    With SHARED_CACHE_PATH the entries and the table counters live in a SharedMemoryCache that
+    all worker processes on the machine share. Without it the counters are per process and miss
+    writes of other processes: the cache is then only on by default with SINGLE_WRITER=true.
+    """
+    SHARED_PATH = os.getenv("SHARED_CACHE_PATH")
+    # the table counters only see every write when they are shared or this process is the only
+    # writer, otherwise the cache is off unless QUERY_CACHE=true turns it on explicitly
+    TRUSTED = bool(SHARED_PATH) or TableVersion.SINGLE_WRITER
+    ENABLED = (os.getenv("QUERY_CACHE") or ("true" if TRUSTED else "false")).lower() in ("1", "true", "yes")
+    MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 1000))
+    MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    # seconds after which an entry is refreshed even without a write, 0 means never. Without
+    # trusted counters the writes of other processes are only picked up after this time
+    MAX_AGE = float(os.getenv("QUERY_CACHE_MAX_AGE") or (0 if TRUSTED else 30))
+    STALE_WHILE_REVALIDATE = os.getenv("QUERY_CACHE_STALE_WHILE_REVALIDATE", "false").lower() in ("1", "true", "yes")
+    SHARED_SLOTS = int(os.getenv("SHARED_CACHE_SLOTS", 1024))
+    SHARED_SLOT_SIZE = int(os.getenv("SHARED_CACHE_SLOT_SIZE", 65536))
+
+    backend: ICache = (SharedMemoryCache(SHARED_PATH, SHARED_SLOTS, SHARED_SLOT_SIZE) if SHARED_PATH
+                       else MemoryCache(MAX_ENTRIES, MAX_BYTES))
+    stats = {"hits": 0, "misses": 0, "stale": 0}
+    # key -> [reads, tables, parts] of the most read keys, used for snapshots and warm-up
+    usage = {}
+
+    _refreshing = set()
+    _lock = threading.Lock()
+    _executor = None
+
+    @staticmethod
+    def key(*parts) -> str:
+        return json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+
+    @classmethod
+    def fetch(cls, tables: tuple, parts: tuple, loader):
+        """
+        cached result of loader() for parts, loader runs on a miss, None results are not cached
+        """
+        key = cls.key(*parts)
+        cls.track(key, tables, parts)
+        entry = cls.backend.get(key)
+        if entry is not None:
+            version, stored, value = entry
+            if version == TableVersion.token(*tables) and (not cls.MAX_AGE or time.time() - stored < cls.MAX_AGE):
+                cls.stats["hits"] += 1
+                return value
+            if cls.STALE_WHILE_REVALIDATE:
+                cls.stats["stale"] += 1
+                cls.__refresh(key, tables, loader)
+                return value
+        cls.stats["misses"] += 1
+        return cls.__load(key, tables, loader)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.backend.clear()
+
+    @classmethod
+    def hot(cls, limit: int) -> list:
+        """(key, tables, parts, reads) of the most read keys, most read first"""
+        with cls._lock:
+            usage = sorted(cls.usage.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        return [(key, tables, parts, reads) for key, (reads, tables, parts) in usage]
+
+    @classmethod
+    def track(cls, key: str, tables: tuple, parts: tuple, reads: int = 1) -> None:
+        """count reads of a key, the usage is bounded to twice MAX_ENTRIES keys"""
+        with cls._lock:
+            counted = cls.usage.get(key)
+            if counted is not None:
+                counted[0] += reads
+                return
+            if len(cls.usage) >= 2 * cls.MAX_ENTRIES:
+                # forget the less read half, new keys have to earn their place again
+                keep = sorted(cls.usage.items(), key=lambda item: item[1][0], reverse=True)[:cls.MAX_ENTRIES]
+                cls.usage = dict(keep)
+            cls.usage[key] = [reads, tables, parts]
+
+#--------------------Private Methods ---------------------------------------
+
+    @classmethod
+    def __load(cls, key: str, tables: tuple, loader):
+        # the version is read before the query, a write during the query makes the entry outdated
+        version = TableVersion.token(*tables)
+        value = loader()
+        if value is not None:
+            cls.backend.set(key, (version, time.time(), value))
+        return value
+
+    @classmethod
+    def __refresh(cls, key: str, tables: tuple, loader):
+        with cls._lock:
+            if key in cls._refreshing:
+                return
+            cls._refreshing.add(key)
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="query-cache")
+
+        def refresh():
+            try:
+                cls.__load(key, tables, loader)
+            finally:
+                with cls._lock:
+                    cls._refreshing.discard(key)
+        cls._executor.submit(refresh)
+
+
+if isinstance(QueryCache.backend, SharedMemoryCache):
+    # the entries are shared, so must be the counters that invalidate them
+    TableVersion.share(QueryCache.backend)
@@ -0,0 +1,153 @@
+from sqlalchemy import func
+
+class QueryFilter:
+    """
+    Query-parameter DSL for list endpoints, compiled to parameterized SQLAlchemy expressions
+
+        ?ps__gte=100&name__prefix=BM&sort=-ps,name&limit=20&offset=40
+
+    field__op=value with the operators below (no operator means eq), `sort` takes a comma
+    separated list of fields, a leading '-' sorts descending, `q` is a full-text search on
+    the `__searchable__` columns of the table (see SearchIndex). Only the fields a model lists in
+    `filterable` / `sortable` can be used, values are converted to the column type and always
+    sent as bound parameters.
+    """
+    OPERATORS = {
+        "eq": lambda column, value: column == value,
+        "ne": lambda column, value: column != value,
+        "gt": lambda column, value: column > value,
+        "gte": lambda column, value: column >= value,
+        "lt": lambda column, value: column < value,
+        "lte": lambda column, value: column <= value,
+        "in": lambda column, values: column.in_(values),
+        "prefix": lambda column, value: column.startswith(value, autoescape=True),
+        "contains": lambda column, value: column.contains(value, autoescape=True),
+    }
+    TEXT_OPERATORS = ("prefix", "contains")
+    AGGREGATES = {"count": func.count, "min": func.min, "max": func.max, "avg": func.avg, "sum": func.sum}
+    RESERVED = ("sort", "limit", "offset", "q", "group_by", "group_prefix", "metrics")
+    MAX_LIMIT = 1000
+
+    @staticmethod
+    def parse(model, params: dict, ignore: tuple = ()) -> dict:
+        """
+        {"where": [...], "order_by": [...], "limit": int|None, "offset": int|None, "search": str|None}
+        raises ValueError with a message for the client on anything not allowed
+        """
+        columns = model.table.__table__.columns
+        where, order_by = [], []
+        for key, value in params.items():
+            if key in QueryFilter.RESERVED or key in ignore or key.startswith("_"):
+                continue
+            field, _, operator = key.partition("__")
+            operator = operator or "eq"
+            if field not in model.filterable:
+                raise ValueError(f"Filtering on '{field}' is not allowed")
+            if operator not in QueryFilter.OPERATORS:
+                raise ValueError(f"Unknown filter operator '{operator}'")
+            column = columns[field]
+            if operator in QueryFilter.TEXT_OPERATORS and column.type.python_type is not str:
+                raise ValueError(f"'{operator}' is only allowed on text fields")
+            if operator == "in":
+                value = [QueryFilter.__convert(column, part) for part in QueryFilter.__parts(value)]
+            else:
+                value = QueryFilter.__convert(column, QueryFilter.__last(value))
+            where.append(QueryFilter.OPERATORS[operator](column, value))
+
+        sort = QueryFilter.__last(params.get("sort"))
+        for field in (sort.split(",") if sort else []):
+            descending = field.startswith("-")
+            field = field.lstrip("-+").strip()
+            if field not in model.sortable:
+                raise ValueError(f"Sorting by '{field}' is not allowed")
+            order_by.append(columns[field].desc() if descending else columns[field].asc())
+
+        search = QueryFilter.__last(params.get("q"))
+        if search is not None and not getattr(model.table, "__searchable__", None):
+            raise ValueError("Search is not available here")
+
+        limit = QueryFilter.__integer(params, "limit")
+        if limit is not None:
+            limit = min(limit, QueryFilter.MAX_LIMIT)
+        return {"where": where, "order_by": order_by, "limit": limit,
+                "offset": QueryFilter.__integer(params, "offset"), "search": search}
+
+    @staticmethod
+    def aggregates(model, params: dict) -> dict:
+        """
+        ?group_by=name&group_prefix=2&metrics=count,avg:ps,max:ps
+        {"group_by": [...], "metrics": [...], "names": [...]}, group fields must be filterable,
+        metric fields must be listed in the model's `aggregatable`
+        """
+        columns = model.table.__table__.columns
+        group_by = []
+        prefix = QueryFilter.__integer(params, "group_prefix")
+        fields = QueryFilter.__last(params.get("group_by"))
+        for field in (fields.split(",") if fields else []):
+            field = field.strip()
+            if field not in model.filterable:
+                raise ValueError(f"Grouping by '{field}' is not allowed")
+            column = columns[field]
+            if prefix and column.type.python_type is str:
+                group_by.append(func.substr(column, 1, prefix).label(field))
+            else:
+                group_by.append(column.label(field))
+
+        metrics = []
+        for metric in (QueryFilter.__last(params.get("metrics")) or "count").split(","):
+            function, _, field = metric.strip().partition(":")
+            if function not in QueryFilter.AGGREGATES:
+                raise ValueError(f"Unknown aggregate '{function}'")
+            if function == "count" and not field:
+                metrics.append(func.count().label("count"))
+                continue
+            if field not in model.aggregatable:
+                raise ValueError(f"Aggregating '{field}' is not allowed")
+            metrics.append(QueryFilter.AGGREGATES[function](columns[field]).label(f"{function}_{field}"))
+        return {"group_by": group_by, "metrics": metrics, "names": [label.name for label in group_by + metrics]}
+
+    @staticmethod
+    def unindexed(model) -> list:
+        """filterable/sortable fields that no index starts with, each of them means a table scan"""
+        table = model.table.__table__
+        leading = {index.columns.values()[0].name for index in table.indexes}
+        leading |= {constraint.columns.values()[0].name for constraint in table.constraints
+                    if hasattr(constraint, "columns") and len(constraint.columns)}
+        fields = dict.fromkeys(tuple(model.filterable) + tuple(model.sortable))
+        return [field for field in fields
+                if field not in leading and not table.c[field].index and not table.c[field].unique]
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __last(value):
+        # parse_qs delivers lists, a repeated parameter counts with its last value
+        if isinstance(value, list):
+            return value[-1] if value else None
+        return value
+
+    @staticmethod
+    def __parts(value) -> list:
+        # "1,2,3" from the query string, [1, 2, 3] from a batch, repeated parameters add up
+        values = value if isinstance(value, (list, tuple)) else [value]
+        return [part for item in values if item is not None for part in str(item).split(",") if part != ""]
+
+    @staticmethod
+    def __convert(column, value):
+        try:
+            return column.type.python_type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value '{value}' for '{column.name}'")
+
+    @staticmethod
+    def __integer(params, key):
+        value = QueryFilter.__last(params.get(key))
+        if value in (None, ""):
+            return None
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{key}' must be a number")
+        if value < 0:
+            raise ValueError(f"'{key}' must not be negative")
+        return value
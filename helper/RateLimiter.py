@@ -0,0 +1,107 @@
+import os
+import threading
+import jwt
+from interface.IRateLimitStore import IRateLimitStore
+from helper.MemoryRateLimitStore import MemoryRateLimitStore
+from helper.JWTManager import JWTManager
+
+
+class RateLimiter:
+    """
+    Admission control in front of the controllers
+
+    1. token bucket per client, the client is the JWT `user_id` if the request carries a valid
+       token, otherwise the remote IP. Exhausted buckets are answered with 429 + Retry-After.
+    2. concurrency limit per controller (and optionally for the whole server). Requests above the
+       limit wait at most QUEUE_TIMEOUT seconds and are then shed with 503 + Retry-After, so
+       overload never turns into an unbounded queue.
+
+    Defaults come from the environment, controllers can override them with class attributes:
+        rate_limit = (10, 20)     # 10 requests/s, bursts of 20, separate bucket for this controller
+        max_concurrency = 8       # at most 8 requests of this controller at the same time
+
+    The buckets live in `RateLimiter.store`, replace it with another IRateLimitStore to share
+    limits between processes.
+    """
+    RATE = float(os.getenv("RATE_LIMIT_RATE", 0))          # requests per second per client, 0 = off
+    BURST = float(os.getenv("RATE_LIMIT_BURST", 0)) or max(RATE, 1.0)
+    MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", 0))  # whole server, 0 = unlimited
+    QUEUE_TIMEOUT = float(os.getenv("QUEUE_TIMEOUT", 0))    # seconds to wait for a free slot
+
+    store: IRateLimitStore = MemoryRateLimitStore()
+
+    _semaphores = {}
+    _lock = threading.Lock()
+    _global_semaphore = threading.BoundedSemaphore(MAX_CONCURRENCY) if MAX_CONCURRENCY > 0 else None
+
+    @classmethod
+    def client_key(cls, headers, remote_address: str) -> str:
+        claims = cls.claims(headers)
+        if claims and claims.get("user_id") is not None:
+            return f"user:{claims['user_id']}"
+        return f"ip:{remote_address}"
+
+    @staticmethod
+    def claims(headers) -> bool|dict:
+        """
+        verified claims of the bearer token, False without a valid token. The result already on
+        AuthenticatedHeaders is used as is, otherwise the token is verified here
+        """
+        claims = getattr(headers, "claims", None)
+        if claims is not None:
+            return claims
+        auth_header = headers.get("Authorization") or ""
+        if not auth_header.startswith("Bearer "):
+            return False
+        try:
+            return JWTManager().verify(auth_header[7:]) or False
+        except jwt.PyJWTError:
+            return False  # invalid tokens are limited by address, the controller rejects them later
+
+    @classmethod
+    def check(cls, headers, remote_address: str, controller_name: str, controller_instance) -> float:
+        """0 if the request may pass, otherwise the seconds the client should wait"""
+        rate_limit = getattr(controller_instance, "rate_limit", None)
+        if rate_limit:
+            rate, burst = rate_limit
+            client_key = cls.client_key(headers, remote_address)
+            return cls.store.consume(f"{client_key}:{controller_name}", rate, burst)
+        if cls.RATE > 0:
+            return cls.store.consume(cls.client_key(headers, remote_address), cls.RATE, cls.BURST)
+        return 0.0
+
+    @classmethod
+    def acquire(cls, controller_name: str, controller_instance) -> bool:
+        """take a concurrency slot, every successful acquire must be followed by release()"""
+        semaphore = cls.__semaphore(controller_name, getattr(controller_instance, "max_concurrency", None))
+        if cls._global_semaphore and not cls.__take(cls._global_semaphore):
+            return False
+        if semaphore and not cls.__take(semaphore):
+            if cls._global_semaphore:
+                cls._global_semaphore.release()
+            return False
+        return True
+
+    @classmethod
+    def release(cls, controller_name: str) -> None:
+        semaphore = cls._semaphores.get(controller_name)
+        if semaphore:
+            semaphore.release()
+        if cls._global_semaphore:
+            cls._global_semaphore.release()
+
+    @classmethod
+    def __semaphore(cls, controller_name: str, limit):
+        if not limit:
+            return None
+        semaphore = cls._semaphores.get(controller_name)
+        if semaphore is None:
+            with cls._lock:
+                semaphore = cls._semaphores.setdefault(controller_name, threading.BoundedSemaphore(limit))
+        return semaphore
+
+    @classmethod
+    def __take(cls, semaphore) -> bool:
+        if cls.QUEUE_TIMEOUT > 0:
+            return semaphore.acquire(timeout=cls.QUEUE_TIMEOUT)
+        return semaphore.acquire(blocking=False)
@@ -0,0 +1,46 @@
+from helper.RequestBody import RequestBody
+from helper.TrafficCapture import TrafficCapture
+
+class Request:
+    """
+    One request as the middleware stages and the controller endpoint of a route see it
+
+    data: query parameters for GET, the body for the other methods (read by load() once the
+    outer stages let the request through). Stages add response headers (ETag, Server-Timing, ...)
+    to `response_headers` and choose the response `encoding`.
+
+    Sub-requests of a batch are `nested`: they have no body stream and skip the stages that only
+    make sense once per HTTP request (concurrency slots, conditional GET, Idempotency-Key).
+    """
+    __slots__ = ("method_HTTP", "path", "headers", "data", "client_address", "rfile", "until_eof",
+                 "capture", "nested", "encoding", "response_headers", "body_read", "streaming")
+
+    def __init__(self, method_HTTP: str, path: str, headers, data=None, client_address: str = "",
+                 rfile=None, until_eof: bool = False, capture: dict = None, nested: bool = False):
+        self.method_HTTP = method_HTTP
+        self.path = path
+        self.headers = headers
+        self.data = data
+        self.client_address = client_address
+        self.rfile = rfile
+        self.until_eof = until_eof
+        self.capture = capture
+        self.nested = nested
+        self.encoding = None
+        self.response_headers = {}
+        self.body_read = False
+        # NDJSON upload: data is a generator that reads the body while the controller consumes it
+        self.streaming = False
+
+    def load(self, max_body_size: int = None) -> None:
+        """
+        read the body into data: a dict for JSON, a generator of records for NDJSON uploads.
+        Controllers can lower or raise the body limit with a `max_body_size` attribute.
+        """
+        if self.rfile is None or self.body_read:
+            return
+        body = RequestBody(self.rfile, self.headers, max_body_size, until_eof=self.until_eof)
+        self.data = body.records() if body.streaming else body.json()
+        self.body_read = True
+        self.streaming = body.streaming
+        TrafficCapture.body(self.capture, self.data)
@@ -0,0 +1,182 @@
+import os
+import json
+from helper.Compression import Compression
+from helper.HttpError import HttpError
+
+
+class RequestBody:
+    """
+    Bounded, streaming reader for HTTP request bodies
+
+    The body is read in chunks from `Content-Length` or `Transfer-Encoding: chunked` input,
+    decompressed on the fly when `Content-Encoding` is set, and never allowed to grow past the
+    configured limit. A declared length above the limit is rejected with 413 before a single
+    byte is read; chunked and compressed bodies are counted while they arrive, which also
+    protects against decompression bombs.
+
+    NDJSON bodies (application/x-ndjson) are not buffered at all, `records()` yields one parsed
+    record per line while the upload is still in progress, together with its line number.
+    """
+    MAX_SIZE = int(os.getenv("MAX_BODY_SIZE", 1024 * 1024))                  # JSON bodies, 1 MB
+    MAX_STREAM_SIZE = int(os.getenv("MAX_STREAM_BODY_SIZE", 256 * 1024 * 1024))  # NDJSON uploads, 256 MB
+    CHUNK_SIZE = 64 * 1024
+    NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+    def __init__(self, rfile, headers, max_size: int = None, until_eof: bool = False):
+        """until_eof: rfile ends with the body and is already de-chunked (WSGI and ASGI servers)"""
+        self.rfile = rfile
+        self.headers = headers
+        self.streaming = self.is_ndjson(headers)
+        self.max_size = max_size or (self.MAX_STREAM_SIZE if self.streaming else self.MAX_SIZE)
+        self.chunked = not until_eof and "chunked" in (headers.get("Transfer-Encoding") or "").lower()
+        if self.chunked or (until_eof and headers.get("Content-Length") is None):
+            self.content_length = None
+        else:
+            self.content_length = self.__content_length()
+        self.encoding = (headers.get("Content-Encoding") or "identity").strip().lower()
+        if self.encoding != "identity" and not Compression.is_supported(self.encoding):
+            raise HttpError(415, f"Unsupported Content-Encoding '{self.encoding}'")
+        self.size = 0
+
+    @staticmethod
+    def is_ndjson(headers) -> bool:
+        content_type = (headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        return content_type in RequestBody.NDJSON_TYPES
+
+    def read(self) -> bytes:
+        """whole (decoded) body"""
+        return b"".join(self.chunks())
+
+    def json(self):
+        body = self.read()
+        try:
+            return json.loads(body.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {"error": "Invalid JSON format"}
+
+    def records(self):
+        """
+        generator of (line number, record) for NDJSON, parsed while the body is still arriving.
+        Line numbers count every line of the body including blank ones, an HttpError carries the
+        number of the line it stopped at in `line`
+        """
+        buffer = b""
+        line_number = 0
+        try:
+            for chunk in self.chunks():
+                buffer += chunk
+                if len(buffer) > self.MAX_SIZE and b"\n" not in buffer:
+                    raise HttpError(413, f"NDJSON record exceeds {self.MAX_SIZE} bytes")
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    line_number += 1
+                    record = self.__parse_line(line, line_number)
+                    if record is not None:
+                        yield line_number, record
+        except HttpError as e:
+            if e.line is None:
+                # every complete line before was yielded, the error is in the one being read
+                e.line = line_number + 1
+            raise
+        line_number += 1
+        record = self.__parse_line(buffer, line_number)
+        if record is not None:
+            yield line_number, record
+
+    def chunks(self):
+        """decoded body in chunks, raises HttpError(413) as soon as the limit is crossed"""
+        decompressor = Compression.decompressor(self.encoding) if self.encoding != "identity" else None
+        if self.chunked:
+            source = self.__chunked()
+        elif self.content_length is None:
+            source = self.__until_eof()
+        else:
+            source = self.__sized()
+        for chunk in source:
+            if decompressor:
+                try:
+                    chunk = decompressor.decompress(chunk)
+                except Exception:
+                    raise HttpError(400, f"Request body is not valid {self.encoding}")
+            self.__count(len(chunk))
+            if chunk:
+                yield chunk
+        if decompressor:
+            tail = decompressor.flush()
+            self.__count(len(tail))
+            if tail:
+                yield tail
+
+#--------------------Private Methods ---------------------------------------
+
+    def __content_length(self):
+        value = self.headers.get("Content-Length")
+        if value is None:
+            return 0
+        try:
+            length = int(value)
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length header")
+        if length < 0:
+            raise HttpError(400, "Invalid Content-Length header")
+        # reject before reading anything, the client may still be sending
+        if length > self.max_size:
+            raise HttpError(413, f"Request body exceeds {self.max_size} bytes")
+        return length
+
+    def __count(self, size: int):
+        self.size += size
+        if self.size > self.max_size:
+            raise HttpError(413, f"Request body exceeds {self.max_size} bytes")
+
+    def __sized(self):
+        remaining = self.content_length
+        while remaining > 0:
+            chunk = self.rfile.read(min(self.CHUNK_SIZE, remaining))
+            if not chunk:
+                raise HttpError(400, "Request body is shorter than Content-Length")
+            remaining -= len(chunk)
+            yield chunk
+
+    def __until_eof(self):
+        while True:
+            chunk = self.rfile.read(self.CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __chunked(self):
+        wire_size = 0
+        while True:
+            line = self.rfile.readline(1024)
+            try:
+                size = int(line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise HttpError(400, "Malformed chunked request body")
+            if size == 0:
+                # skip optional trailers up to the closing empty line
+                while self.rfile.readline(1024) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            # the wire size is bounded as well, compressed chunks are checked again after decoding
+            wire_size += size
+            if wire_size > self.max_size:
+                raise HttpError(413, f"Request body exceeds {self.max_size} bytes")
+            while size > 0:
+                chunk = self.rfile.read(min(self.CHUNK_SIZE, size))
+                if not chunk:
+                    raise HttpError(400, "Malformed chunked request body")
+                size -= len(chunk)
+                yield chunk
+            self.rfile.readline(1024)
+
+    def __parse_line(self, line: bytes, line_number: int):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            error = HttpError(400, f"Invalid JSON on NDJSON line {line_number}")
+            error.line = line_number
+            raise error
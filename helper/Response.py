@@ -1,49 +1,108 @@
+import json
+
+
 class Response:
+    """
+    One HTTP response: status code, optional headers and the message for the JSON body
+
+    The body {"status": "success"|"error", "message": ...} is encoded lazily, exactly once, on
+    first access of `body`. The status code travels only in the HTTP status line.
+
+    Responses with a constant message (e.g. the 403 answers of AuthController) can be created with
+    Response.static(): their body is encoded the first time and the bytes are reused afterwards.
+    """
+    __slots__ = ("status_code", "message", "headers", "_body")
+
+    _static_bodies = {}
+
+    def __init__(self, status_code: int, message=None, headers: dict = None, body: bytes = None):
+        self.status_code = status_code
+        self.message = message
+        self.headers = headers
+        self._body = body
+
+    @property
+    def status(self) -> str:
+        return "error" if self.status_code >= 400 else "success"
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = json.dumps({"status": self.status, "message": self.message}).encode("utf-8")
+        return self._body
+
+    def with_header(self, name: str, value: str) -> "Response":
+        # the dict is replaced, not changed, so a response may share its headers safely
+        self.headers = {**self.headers, name: value} if self.headers else {name: value}
+        return self
+
+    def to_dict(self) -> dict:
+        """response as a plain dict including the status code, e.g. for batch results"""
+        return {"status_code": self.status_code, "status": self.status, "message": self.message}
+
+    @staticmethod
+    def of(result) -> "Response":
+        """accept the dict responses of older controllers"""
+        if isinstance(result, Response):
+            return result
+        if isinstance(result, dict) and "status_code" in result:
+            return Response(result["status_code"], result.get("message"))
+        return Response(200, result)
+
+    @staticmethod
+    def static(status_code: int, message: str) -> "Response":
+        """
+        response with a constant message, the encoded body is cached per (status, message).
+        The cache is never emptied, messages containing request data must use Response()
+        """
+        key = (status_code, message)
+        body = Response._static_bodies.get(key)
+        if body is None:
+            body = Response(status_code, message).body
+            Response._static_bodies[key] = body
+        return Response(status_code, message, body=body)
+
     @staticmethod
     def response(status_code, data):
-        return {
-            "status_code": status_code,
-            "status": "error" if status_code >= 400 else "success",
-            "message": data
-        }
+        return Response(status_code, data)
 
 
     @staticmethod
     def success(data):
-        return Response.response(200, data)
-    
+        return Response(200, data)
+
     @staticmethod
     def created(data):
-        return Response.response(201, data)
+        return Response(201, data)
 
     @staticmethod
     def no_content():
-        return Response.response(204, None)
+        return Response(204, None)
 
     @staticmethod
     def not_found(message):
-        return Response.response(404, message)
+        return Response(404, message)
 
     @staticmethod
     def conflict(message):
-        return Response.response(409, message)
-    
+        return Response(409, message)
+
     @staticmethod
     def bad_request(message):
-        return Response.response(400, message)
-    
+        return Response(400, message)
+
     @staticmethod
     def deleted(message):
-        return Response.response(202, message)
-    
+        return Response(202, message)
+
     @staticmethod
     def forbidden(message):
-        return Response.response(403, message)
+        return Response(403, message)
 
     @staticmethod
     def unauthorized(message):
-        return Response.response(401, message)
+        return Response(401, message)
 
     @staticmethod
     def internal_error(message):
-        return Response.response(500, message)
+        return Response(500, message)
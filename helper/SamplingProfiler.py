@@ -0,0 +1,185 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+class SamplingProfiler:
+    """
+    Process wide, pure-Python stack sampler.
+
+    A background thread wakes up every `interval` seconds, walks the current frame of every
+    other thread (sys._current_frames) and counts the resulting call stacks. Nothing is
+    installed into the interpreter (no sys.setprofile), so request threads run at full
+    speed and the cost is bounded by the sampling rate. When the profiler is stopped there
+    is no thread at all, which makes it safe to keep available in production.
+
+    The result is exported in the "collapsed stack" format (frame;frame;frame count) that
+    flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    DEFAULT_INTERVAL = 0.01   # 100 samples per second
+    MIN_INTERVAL = 0.001
+    MAX_DURATION = 600        # a forgotten profiler stops itself after 10 minutes
+    MAX_STACKS = 10000        # bound memory for very diverse workloads
+    MAX_DEPTH = 128
+    MAX_LABELS = 50000        # code objects created at runtime (exec, lambdas, reloads) keep coming
+
+    # Leaf frames of threads that are only waiting for work (accept loop, idle pool workers)
+    IDLE_FRAMES = {
+        ("selectors.py", "select"),
+        ("threading.py", "wait"),
+        ("threading.py", "_wait_for_tstate_lock"),
+        ("queue.py", "get"),
+    }
+
+    _lock = threading.Lock()
+    _thread: Optional[threading.Thread] = None
+    _stop_event: Optional[threading.Event] = None
+    _stacks = Counter()
+    _labels = {}
+    _samples = 0
+    _interval = DEFAULT_INTERVAL
+    _include_idle = False
+    _started_at = None
+    _stopped_at = None
+
+    @classmethod
+    def start(cls, interval: float = DEFAULT_INTERVAL, duration: float = None, include_idle: bool = False) -> bool:
+        """
+        start sampling in a background thread, previous samples are discarded
+        returns False if the profiler is already running
+        """
+        with cls._lock:
+            if cls.is_running():
+                return False
+            duration = min(duration or cls.MAX_DURATION, cls.MAX_DURATION)
+            cls._interval = max(float(interval), cls.MIN_INTERVAL)
+            cls._include_idle = include_idle
+            cls._stacks = Counter()
+            cls._samples = 0
+            cls._started_at = time.time()
+            cls._stopped_at = None
+            cls._stop_event = threading.Event()
+            cls._thread = threading.Thread(
+                target=cls._run,
+                args=(cls._stop_event, time.monotonic() + duration),
+                name="SamplingProfiler",
+                daemon=True,
+            )
+            cls._thread.start()
+            return True
+
+    @classmethod
+    def stop(cls) -> bool:
+        """stop sampling and keep the collected samples, returns False if it was not running"""
+        with cls._lock:
+            if not cls.is_running():
+                return False
+            cls._stop_event.set()
+            thread = cls._thread
+        thread.join()
+        return True
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._stacks = Counter()
+            cls._samples = 0
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._thread is not None and cls._thread.is_alive()
+
+    @classmethod
+    def profile(cls, seconds: float, interval: float = DEFAULT_INTERVAL, include_idle: bool = False) -> bool:
+        """sample for a fixed time window and block until it is over"""
+        if not cls.start(interval=interval, duration=seconds, include_idle=include_idle):
+            return False
+        cls._thread.join()
+        return True
+
+    @classmethod
+    def status(cls) -> dict:
+        end = cls._stopped_at or time.time()
+        return {
+            "running": cls.is_running(),
+            "interval": cls._interval,
+            "samples": cls._samples,
+            "stacks": len(cls._stacks),
+            "started_at": cls._started_at,
+            "elapsed": round(end - cls._started_at, 3) if cls._started_at else 0,
+        }
+
+    @classmethod
+    def collapsed(cls, limit: int = None) -> list:
+        """stacks in collapsed format, most frequent first: 'root;caller;leaf count'"""
+        with cls._lock:
+            items = cls._stacks.most_common(limit)
+        return [f"{stack} {count}" for stack, count in items]
+
+    @classmethod
+    def top(cls, limit: int = 20) -> list:
+        """leaf frames ordered by self time, useful without a flame graph viewer"""
+        with cls._lock:
+            stacks = list(cls._stacks.items())
+        leaves = Counter()
+        for stack, count in stacks:
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {"frame": frame, "samples": count, "percent": round(100.0 * count / total, 2)}
+            for frame, count in leaves.most_common(limit)
+        ]
+
+#--------------------Private Methods ---------------------------------------
+
+    @classmethod
+    def _run(cls, stop_event: threading.Event, deadline: float) -> None:
+        own_id = threading.get_ident()
+        while not stop_event.wait(cls._interval):
+            if time.monotonic() >= deadline:
+                break
+            frames = sys._current_frames()
+            with cls._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    stack = cls._stack(frame)
+                    if stack is None:
+                        continue
+                    if stack in cls._stacks or len(cls._stacks) < cls.MAX_STACKS:
+                        cls._stacks[stack] += 1
+                    else:
+                        cls._stacks["[truncated]"] += 1
+                cls._samples += 1
+            del frames
+        # the cache holds the code objects, they must not outlive the profile run
+        cls._labels = {}
+        cls._stopped_at = time.time()
+
+    @classmethod
+    def _stack(cls, frame) -> Optional[str]:
+        leaf = frame.f_code
+        if not cls._include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in cls.IDLE_FRAMES:
+            return None
+        names = []
+        while frame is not None and len(names) < cls.MAX_DEPTH:
+            names.append(cls._label(frame.f_code))
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+    @classmethod
+    def _label(cls, code) -> str:
+        # labels are cached per code object, formatting is the expensive part of a sample
+        label = cls._labels.get(code)
+        if label is None:
+            path = code.co_filename.replace(os.sep, "/").rsplit("/", 2)
+            label = f"{code.co_name} ({'/'.join(path[-2:])})"
+            if len(cls._labels) >= cls.MAX_LABELS:
+                cls._labels = {}
+            cls._labels[code] = label
+        return label
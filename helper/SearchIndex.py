@@ -0,0 +1,69 @@
+import re
+from sqlalchemy import table as table_clause, column, literal_column, false
+
+class SearchIndex:
+    """
+    SQLite FTS5 index for the text columns a table model declares in `__searchable__`
+
+        class AutoTable(Base):
+            __searchable__ = ("name",)
+
+    The migration creates an external-content FTS5 table `<table>_fts` and the triggers that
+    keep it in sync with inserts, updates and deletes. Searches match every word of the query
+    as a word prefix ("bm 3" finds "BMW 320d") and are ordered by relevance.
+    """
+    DEFAULT_LIMIT = 50
+    WORD = re.compile(r"\w+", re.UNICODE)
+
+    @staticmethod
+    def name(table) -> str:
+        return f"{table.__tablename__}_fts"
+
+    @staticmethod
+    def statements(table) -> list:
+        """DDL for the FTS table and its sync triggers"""
+        name = SearchIndex.name(table)
+        source = table.__tablename__
+        key = table.__table__.primary_key.columns[0].name
+        columns = ", ".join(table.__searchable__)
+        new_values = ", ".join(f"new.{column}" for column in table.__searchable__)
+        old_values = ", ".join(f"old.{column}" for column in table.__searchable__)
+        insert = f"INSERT INTO {name}(rowid, {columns}) VALUES (new.{key}, {new_values});"
+        delete = f"INSERT INTO {name}({name}, rowid, {columns}) VALUES ('delete', old.{key}, {old_values});"
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5({columns}, content='{source}', "
+            f"content_rowid='{key}', prefix='2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {source} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {source} BEGIN {delete} END",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON {source} BEGIN {delete} {insert} END",
+        ]
+
+    @staticmethod
+    def rebuild(table) -> str:
+        """fills the index from the existing rows, needed once after the FTS table is created"""
+        name = SearchIndex.name(table)
+        return f"INSERT INTO {name}({name}) VALUES ('rebuild')"
+
+    @staticmethod
+    def expression(q: str) -> str|None:
+        """
+        FTS5 query from user input: words only, each one quoted and matched as a prefix,
+        so operators and column filters in the input have no effect
+        """
+        words = SearchIndex.WORD.findall(q or "")
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+
+    @staticmethod
+    def apply(statement, table, q: str, ranked: bool = True):
+        """restricts a SELECT on `table` to the rows matching q, best matches first when ranked"""
+        expression = SearchIndex.expression(q)
+        if expression is None:
+            return statement.where(false())
+        name = SearchIndex.name(table)
+        fts = table_clause(name, column("rowid"), column("rank"))
+        key = table.__table__.primary_key.columns[0]
+        statement = statement.join_from(table.__table__, fts, fts.c.rowid == key)
+        statement = statement.where(literal_column(name).op("MATCH")(expression))
+        return statement.order_by(fts.c.rank) if ranked else statement
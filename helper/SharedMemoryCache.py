@@ -0,0 +1,154 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import uuid
+from contextlib import contextmanager
+from interface.ICache import ICache
+
+try:
+    import fcntl
+except ImportError:  # Windows: the segment still works, but only for the threads of one process
+    fcntl = None
+
+
+class SharedMemoryCache(ICache):
+    """
+    Cache in a memory-mapped file that all worker processes of one machine open (SHARED_CACHE_PATH,
+    best on a tmpfs such as /dev/shm)
+
+    The file holds fixed-size slots, a key always maps to the same slot, a newer key overwrites
+    an older one in the same slot. Values larger than a slot are not cached. Writers take one of
+    STRIPES locks (a thread lock plus an fcntl byte-range lock for other processes), readers take
+    no lock: every slot has a sequence number that is odd while it is written, a read that sees
+    it change retries and finally counts as a miss.
+
+    The file also holds table write counters (version/bump_version), TableVersion uses them when
+    the cache is shared, so a write in one worker invalidates the entries of all workers.
+    """
+    MAGIC = b"MPYSHM01"
+    HEADER = struct.Struct("<8s8sIII4x")   # magic, segment id, slots, slot size, version slots
+    SLOT = struct.Struct("<Q16sI4x")       # sequence, key hash, length
+    COUNTER = struct.Struct("<16sQ")       # table hash, version
+    STRIPES = 64
+    READ_RETRIES = 3
+
+    def __init__(self, path: str, slots: int = 1024, slot_size: int = 65536, version_slots: int = 256):
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._locks = [threading.Lock() for _ in range(self.STRIPES + 1)]
+        with self.__locked(self.STRIPES):
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            header = os.read(self._fd, self.HEADER.size)
+            if len(header) == self.HEADER.size and header[:8] == self.MAGIC:
+                # the first process decides the layout, everyone else adopts it
+                _, segment_id, slots, slot_size, version_slots = self.HEADER.unpack(header)
+            else:
+                segment_id = uuid.uuid4().bytes[:8]
+                size = self.HEADER.size + version_slots * self.COUNTER.size + slots * slot_size
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.write(self._fd, self.HEADER.pack(self.MAGIC, segment_id, slots, slot_size, version_slots))
+        self.slots = slots
+        self.slot_size = slot_size
+        self.version_slots = version_slots
+        self.id = segment_id.hex()
+        self._counters = self.HEADER.size
+        self._data = self._counters + version_slots * self.COUNTER.size
+        self._map = mmap.mmap(self._fd, self._data + slots * slot_size)
+
+    def get(self, key: str):
+        digest, offset = self.__slot(key)
+        for _ in range(self.READ_RETRIES):
+            sequence, slot_key, length = self.SLOT.unpack_from(self._map, offset)
+            if sequence & 1:
+                continue  # being written
+            if slot_key != digest or not length:
+                return None
+            start = offset + self.SLOT.size
+            data = self._map[start:start + length]
+            if self.SLOT.unpack_from(self._map, offset)[0] == sequence:
+                return json.loads(data)
+        return None
+
+    def set(self, key: str, value) -> None:
+        data = json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+        if len(data) > self.slot_size - self.SLOT.size:
+            return
+        digest, offset = self.__slot(key)
+        with self.__locked(self.__stripe(offset)):
+            sequence = self.SLOT.unpack_from(self._map, offset)[0]
+            self.SLOT.pack_into(self._map, offset, sequence + 1, digest, 0)
+            start = offset + self.SLOT.size
+            self._map[start:start + len(data)] = data
+            self.SLOT.pack_into(self._map, offset, sequence + 2, digest, len(data))
+
+    def delete(self, key: str) -> None:
+        digest, offset = self.__slot(key)
+        with self.__locked(self.__stripe(offset)):
+            sequence, slot_key, _ = self.SLOT.unpack_from(self._map, offset)
+            if slot_key == digest:
+                self.SLOT.pack_into(self._map, offset, sequence + 2, digest, 0)
+
+    def clear(self) -> None:
+        for index in range(self.slots):
+            offset = self._data + index * self.slot_size
+            with self.__locked(self.__stripe(offset)):
+                sequence, slot_key, _ = self.SLOT.unpack_from(self._map, offset)
+                self.SLOT.pack_into(self._map, offset, sequence + 2, slot_key, 0)
+
+    def version(self, table: str) -> int:
+        offset = self.__counter(table, claim=False)
+        return self.COUNTER.unpack_from(self._map, offset)[1] if offset is not None else 0
+
+    def bump_version(self, table: str) -> int:
+        with self.__locked(self.STRIPES):
+            offset = self.__counter(table, claim=True)
+            name, version = self.COUNTER.unpack_from(self._map, offset)
+            self.COUNTER.pack_into(self._map, offset, name, version + 1)
+            return version + 1
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __hash(value: str) -> bytes:
+        return hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+
+    def __slot(self, key: str):
+        digest = self.__hash(key)
+        index = int.from_bytes(digest[:8], "little") % self.slots
+        return digest, self._data + index * self.slot_size
+
+    def __stripe(self, offset: int) -> int:
+        return ((offset - self._data) // self.slot_size) % self.STRIPES
+
+    def __counter(self, table: str, claim: bool):
+        # open addressing over the counter area, a free entry is claimed under the counter lock
+        digest = self.__hash(table)
+        start = int.from_bytes(digest[:8], "little") % self.version_slots
+        for step in range(self.version_slots):
+            offset = self._counters + ((start + step) % self.version_slots) * self.COUNTER.size
+            name = self.COUNTER.unpack_from(self._map, offset)[0]
+            if name == digest:
+                return offset
+            if name == bytes(16):
+                if not claim:
+                    return None
+                self.COUNTER.pack_into(self._map, offset, digest, 0)
+                return offset
+        raise RuntimeError("Shared cache: no free table version slot, raise version_slots")
+
+    @contextmanager
+    def __locked(self, stripe: int):
+        with self._locks[stripe]:
+            if fcntl is None:
+                yield
+                return
+            # lock one byte per stripe beyond the end of the file, it is never read or written
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, (1 << 40) + stripe)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, (1 << 40) + stripe)
@@ -0,0 +1,56 @@
+import json
+import os
+import threading
+
+class SingleFlight:
+    """
+    Request coalescing for idempotent reads
+
+    The first caller for a key runs the function, callers arriving with the same key while it
+    is running wait for it and get the same result (or the same exception) instead of running
+    it again. Nothing is kept after the call finished, this is not a cache.
+    """
+    ENABLED = os.getenv("SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+
+    _calls = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts) -> str:
+        """stable key for any JSON-like parts, e.g. controller name, query params and auth header"""
+        return json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+
+    @classmethod
+    def do(cls, key: str, function):
+        with cls._lock:
+            call = cls._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                cls._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with cls._lock:
+                del cls._calls[key]
+            call.done.set()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
@@ -0,0 +1,57 @@
+import json
+import sqlite3
+import threading
+import time
+from interface.IIdempotencyStore import IIdempotencyStore
+
+
+class SqliteIdempotencyStore(IIdempotencyStore):
+    """
+    Records in an SQLite file, they survive a restart and can be shared by the processes of one
+    machine. Expired records are deleted while writing, beyond `max_keys` the oldest ones.
+    """
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT, status INTEGER, body BLOB, headers TEXT, expires REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idempotency_expires ON idempotency(expires)")
+
+    def get(self, key: str) -> None|dict:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT fingerprint, status, body, headers FROM idempotency WHERE key = ? AND expires > ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return {"fingerprint": row[0], "status": row[1], "body": row[2],
+                "headers": json.loads(row[3]) if row[3] else None}
+
+    def put(self, key: str, record: dict, ttl: float) -> None:
+        now = time.time()
+        headers = json.dumps(record["headers"]) if record.get("headers") else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO idempotency (key, fingerprint, status, body, headers, expires) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, record["fingerprint"], record["status"], record["body"], headers, now + ttl)
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self.__purge(now)
+
+#--------------------Private Methods ---------------------------------------
+
+    def __purge(self, now: float) -> None:
+        self._connection.execute("DELETE FROM idempotency WHERE expires <= ?", (now,))
+        self._connection.execute(
+            "DELETE FROM idempotency WHERE key IN (SELECT key FROM idempotency ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_keys,)
+        )
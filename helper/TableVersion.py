@@ -0,0 +1,56 @@
+import os
+import threading
+import uuid
+
+
+class TableVersion:
+    """
+    Per-table write counters
+
+    Every write that goes through the model layer bumps the counter of its table. A reader can
+    remember the versions it has seen and later find out cheaply whether anything changed,
+    without querying the database. Counters live in the process, the boot id makes sure a
+    token from before a restart never matches a token after it.
+
+    With share(store) the counters live in a store shared by several processes (see
+    SharedMemoryCache), a write in one process then changes the tokens of all of them.
+
+    Process-local counters miss the writes of other processes. Caches only rely on the counters
+    when trusted(): they are shared, or SINGLE_WRITER=true says this process is the only writer.
+    """
+    SINGLE_WRITER = os.getenv("SINGLE_WRITER", "false").lower() in ("1", "true", "yes")
+    boot_id = uuid.uuid4().hex[:12]
+    _versions = {}
+    _lock = threading.Lock()
+    _shared = None
+
+    @classmethod
+    def share(cls, store) -> None:
+        """keep the counters in store (version(table), bump_version(table) and id) from now on"""
+        cls._shared = store
+
+    @classmethod
+    def trusted(cls) -> bool:
+        """the counters see every write to the database, an unchanged token means unchanged tables"""
+        return cls._shared is not None or cls.SINGLE_WRITER
+
+    @classmethod
+    def bump(cls, table: str) -> int:
+        if cls._shared is not None:
+            return cls._shared.bump_version(table)
+        with cls._lock:
+            version = cls._versions.get(table, 0) + 1
+            cls._versions[table] = version
+            return version
+
+    @classmethod
+    def get(cls, table: str) -> int:
+        if cls._shared is not None:
+            return cls._shared.version(table)
+        return cls._versions.get(table, 0)
+
+    @classmethod
+    def token(cls, *tables: str) -> str:
+        """a string that changes whenever one of the given tables is written"""
+        origin = cls._shared.id if cls._shared is not None else cls.boot_id
+        return origin + ":" + ",".join(f"{table}={cls.get(table)}" for table in tables)
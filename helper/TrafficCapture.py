@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+class TrafficCapture:
+    """
+    Sampled request log in JSONL for replay.py (TRAFFIC_CAPTURE_PATH, e.g. traffic.jsonl)
+
+    One line per captured request:
+    {"ts": 1760000000.123, "method": "POST", "path": "/auto", "headers": {...}, "body": {...},
+     "status": 200, "response": "...", "response_hash": "...", "duration_ms": 3.2}
+
+    Authorization and cookies are never written, body fields and query parameters named like a
+    secret (password, token, ...) are replaced by "[redacted]". Request bodies longer than
+    TRAFFIC_CAPTURE_MAX_BODY are left out and the record is marked "truncated" (replay.py skips
+    it), responses are cut and the hash of the full response is kept for comparisons.
+    """
+    PATH = os.getenv("TRAFFIC_CAPTURE_PATH")
+    SAMPLE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE", 1.0))
+    MAX_BODY = int(os.getenv("TRAFFIC_CAPTURE_MAX_BODY", 65536))
+    REDACT_FIELDS = tuple(field.strip().lower() for field in
+                          os.getenv("TRAFFIC_CAPTURE_REDACT", "password,token,secret").split(",") if field.strip())
+    HEADERS = ("Content-Type", "Accept", "Accept-Encoding", "If-None-Match", "Idempotency-Key")
+    REDACTED = "[redacted]"
+
+    _file = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def begin(cls, method_HTTP: str, path: str, headers) -> None|dict:
+        """a new record if this request is sampled, None otherwise"""
+        if not cls.PATH or (cls.SAMPLE < 1.0 and random.random() >= cls.SAMPLE):
+            return None
+        captured = {name: headers.get(name) for name in cls.HEADERS if headers.get(name)}
+        if headers.get("Authorization"):
+            # replay.py sends its own token instead
+            captured["Authorization"] = cls.REDACTED
+        return {"ts": time.time(), "method": method_HTTP, "path": cls.__redact_path(path), "headers": captured,
+                "body": None, "_started": time.perf_counter()}
+
+    @classmethod
+    def body(cls, record: None|dict, data) -> None:
+        if record is None:
+            return
+        if isinstance(data, (dict, list)):
+            data = cls.__redact(data)
+            if len(json.dumps(data, default=str)) <= cls.MAX_BODY:
+                record["body"] = data
+            else:
+                # a cut JSON document could not be sent again
+                record["truncated"] = True
+        elif data is not None:
+            record["body"] = "[stream]"
+
+    @classmethod
+    def finish(cls, record: None|dict, status_code: int, body: bytes) -> None:
+        if record is None:
+            return
+        record["duration_ms"] = round((time.perf_counter() - record.pop("_started")) * 1000, 3)
+        record["status"] = status_code
+        record["response"] = body[:cls.MAX_BODY].decode("utf-8", "replace")
+        record["response_hash"] = hashlib.blake2b(body, digest_size=16).hexdigest()
+        line = json.dumps(record, default=str) + "\n"
+        with cls._lock:
+            if cls._file is None:
+                cls._file = open(cls.PATH, "a", encoding="utf-8", buffering=1)
+            cls._file.write(line)
+
+#--------------------Private Methods ---------------------------------------
+
+    @classmethod
+    def __redact_path(cls, path: str) -> str:
+        """?token=... and the like, the path itself is kept as received"""
+        parts = urlsplit(path)
+        if not parts.query:
+            return path
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        if not any(cls.__secret(key) for key, _ in params):
+            return path
+        query = urlencode([(key, cls.REDACTED if cls.__secret(key) else value) for key, value in params], safe="[]")
+        return f"{parts.path}?{query}"
+
+    @classmethod
+    def __secret(cls, name) -> bool:
+        return any(field in str(name).lower() for field in cls.REDACT_FIELDS)
+
+    @classmethod
+    def __redact(cls, data):
+        if isinstance(data, dict):
+            return {key: cls.REDACTED if cls.__secret(key) else cls.__redact(value) for key, value in data.items()}
+        if isinstance(data, list):
+            return [cls.__redact(value) for value in data]
+        return data
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from helper.Compression import Compression
+
+class TrafficReplay:
+    """
+    Replays a TrafficCapture file against a server and measures it
+
+    speed: 1.0 keeps the original gaps between requests, 2.0 sends twice as fast, 0 sends as
+    fast as the workers allow. Requests are sent in captured order, the report has latency
+    percentiles overall and per endpoint and the responses that differ from the captured ones.
+    Records whose body was not captured (truncated or streamed) are skipped and counted.
+    """
+    def __init__(self, base_url: str, token: str = None, speed: float = 1.0, workers: int = 8, timeout: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.speed = speed
+        self.workers = workers
+        self.timeout = timeout
+        self._results = []
+        self._skipped = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(path: str, limit: int = None) -> list:
+        records = []
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    records.append(json.loads(line))
+                    if limit and len(records) >= limit:
+                        break
+        return records
+
+    def run(self, records: list) -> dict:
+        sendable = [record for record in records if self.replayable(record)]
+        self._skipped += len(records) - len(sendable)
+        records = sorted(sendable, key=lambda record: record["ts"])
+        started = time.perf_counter()
+        first = records[0]["ts"] if records else 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for index, record in enumerate(records):
+                if self.speed > 0:
+                    delay = (record["ts"] - first) / self.speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                pool.submit(self.__send, index, record)
+        return self.report(time.perf_counter() - started)
+
+    @staticmethod
+    def replayable(record: dict) -> bool:
+        """the captured request can be sent again as it was: its whole body is in the record"""
+        return not record.get("truncated") and record.get("body") != "[stream]"
+
+    def report(self, elapsed: float) -> dict:
+        results = sorted(self._results, key=lambda result: result["index"])
+        endpoints = {}
+        for result in results:
+            endpoints.setdefault(result["endpoint"], []).append(result["latency_ms"])
+        diffs = [result for result in results if result["diff"]]
+        return {
+            "requests": len(results),
+            "skipped": self._skipped,
+            "seconds": round(elapsed, 3),
+            "rate": round(len(results) / elapsed, 1) if elapsed else 0,
+            "errors": sum(1 for result in results if result["status"] is None or result["status"] >= 500),
+            "latency_ms": self.percentiles([result["latency_ms"] for result in results]),
+            "endpoints": {endpoint: self.percentiles(latencies) for endpoint, latencies in sorted(endpoints.items())},
+            "status_diffs": sum(1 for result in diffs if result["diff"] == "status"),
+            "body_diffs": sum(1 for result in diffs if result["diff"] == "body"),
+            "diffs": [{key: result[key] for key in ("index", "endpoint", "expected", "actual", "diff")} for result in diffs[:20]],
+        }
+
+    @staticmethod
+    def percentiles(values: list) -> dict:
+        if not values:
+            return {"count": 0}
+        values = sorted(values)
+        pick = lambda share: values[min(len(values) - 1, int(share * len(values)))]
+        return {"count": len(values), "p50": round(pick(0.50), 3), "p90": round(pick(0.90), 3),
+                "p99": round(pick(0.99), 3), "max": round(values[-1], 3)}
+
+#--------------------Private Methods ---------------------------------------
+
+    def __send(self, index: int, record: dict):
+        headers = dict(record.get("headers") or {})
+        if "Authorization" in headers:
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            else:
+                del headers["Authorization"]
+        body = record.get("body")
+        data = None
+        if body is not None:
+            data = (json.dumps(body) if isinstance(body, (dict, list)) else str(body)).encode("utf-8")
+        request = urllib.request.Request(self.base_url + record["path"], data=data, headers=headers, method=record["method"])
+        status, content, encoding = None, b"", None
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                status, content, encoding = response.status, response.read(), response.headers.get("Content-Encoding")
+        except urllib.error.HTTPError as e:
+            status, content, encoding = e.code, e.read(), e.headers.get("Content-Encoding")
+        except (urllib.error.URLError, OSError):
+            pass
+        latency = (time.perf_counter() - start) * 1000
+        if encoding and Compression.is_supported(encoding):
+            # the captured hash is of the uncompressed body
+            content = Compression.decompress(content, encoding)
+
+        diff = None
+        if status != record.get("status"):
+            diff = "status"
+        elif record.get("response_hash") and hashlib.blake2b(content, digest_size=16).hexdigest() != record["response_hash"]:
+            diff = "body"
+        endpoint = f"{record['method']} {record['path'].split('?')[0]}"
+        with self._lock:
+            self._results.append({"index": index, "endpoint": endpoint, "status": status, "latency_ms": latency,
+                                  "diff": diff, "expected": record.get("status"), "actual": status})
@@ -0,0 +1,153 @@
+from sqlalchemy import Integer, String, Float, Boolean, Numeric
+from helper.FormatCheck import FormatCheck
+
+
+class Validator:
+    """
+    Declarative validation compiled into plain Python functions
+
+    The schema is derived from the columns of a table class (required = NOT NULL without default,
+    type, String length) and extended with extra constraints per field:
+
+        Validator(AutoTable,
+            name={"min_length": (2, "Name must be at least 2 characters long")},
+            ps={"type": "PS must be a number", "gt": (0, "PS must be greater than 0")},
+        )
+
+    A constraint is `value` or `(value, message)`. Supported: type (message only), required,
+    min_length, max_length, gt, gte, lt, lte, email, choices.
+
+    The schema is turned into Python source once and compiled with exec(), so validating a record
+    costs a handful of inline comparisons and no per-field function calls. Every validator reports
+    all errors of a record at once as {field: message}.
+
+        validate(record, partial=False)  -> {} or {field: message}
+        validate_many(records, partial=False) -> {index: {field: message}} for failing records only
+    partial=True skips missing fields (updates).
+    """
+    _TYPES = (
+        (Boolean, "bool", "{field} must be true or false"),
+        (Integer, "int", "{field} must be a number"),
+        (Float, "(int, float)", "{field} must be a number"),
+        (Numeric, "(int, float)", "{field} must be a number"),
+        (String, "str", "{field} must be a string"),
+    )
+    _MISSING = object()
+
+    def __init__(self, table, fields: tuple = None, **constraints):
+        self.table = table
+        self.rules = self.__rules(table, fields or tuple(constraints), constraints)
+        self.source = self.__generate()
+        namespace = {"_MISSING": self._MISSING, "_email": FormatCheck.EMAIL_PATTERN.match}
+        exec(compile(self.source, f"<Validator {table.__tablename__}>", "exec"), namespace)
+        self.validate = namespace["validate"]
+        self.validate_many = namespace["validate_many"]
+
+    @staticmethod
+    def message(errors: dict) -> str:
+        """all errors of one record as one line, for models that report errors as a string"""
+        return "; ".join(errors.values())
+
+#--------------------Private Methods ---------------------------------------
+
+    def __rules(self, table, fields, constraints) -> list:
+        rules = []
+        columns = table.__table__.columns
+        for field in fields:
+            column = columns.get(field)
+            extra = dict(constraints.get(field, {}))
+            rule = {"field": field, "checks": []}
+            required = column is not None and not column.nullable and column.default is None \
+                and column.server_default is None and not column.primary_key
+            rule["required"] = self.__message(extra.pop("required", required), f"{field} is required")
+
+            type_message = extra.pop("type", None)
+            if column is not None:
+                for sql_type, python_type, default_message in self._TYPES:
+                    if isinstance(column.type, sql_type):
+                        rule["type"] = (python_type, type_message or default_message.format(field=field))
+                        break
+                length = getattr(column.type, "length", None)
+                if length and "max_length" not in extra:
+                    extra["max_length"] = length
+
+            for name, constraint in extra.items():
+                value, message = self.__message(constraint, None)
+                rule["checks"].append(self.__check(field, name, value, message))
+            rules.append(rule)
+        return rules
+
+    def __message(self, constraint, default):
+        if isinstance(constraint, tuple):
+            return constraint
+        return constraint, default
+
+    def __check(self, field, name, value, message):
+        if name == "min_length":
+            return f"len(value) < {value!r}", message or f"{field} must be at least {value} characters long"
+        if name == "max_length":
+            return f"len(value) > {value!r}", message or f"{field} must be at most {value} characters long"
+        if name == "gt":
+            return f"value <= {value!r}", message or f"{field} must be greater than {value}"
+        if name == "gte":
+            return f"value < {value!r}", message or f"{field} must be at least {value}"
+        if name == "lt":
+            return f"value >= {value!r}", message or f"{field} must be less than {value}"
+        if name == "lte":
+            return f"value > {value!r}", message or f"{field} must be at most {value}"
+        if name == "email":
+            return "_email(value) is None", message or f"{field} is not a valid email address"
+        if name == "choices":
+            return f"value not in {frozenset(value)!r}", message or f"{field} must be one of {sorted(value)}"
+        raise ValueError(f"Unknown constraint '{name}' for field '{field}'")
+
+    def __generate(self) -> str:
+        # one block per field, failures are kept as (field, message) and rendered per function
+        blocks = []
+        for rule in self.rules:
+            field = rule["field"]
+            required, required_message = rule["required"]
+            lines = [f"value = record.get({field!r}, _MISSING)",
+                     "if value is _MISSING or value is None:"]
+            if required:
+                lines.append("    if not partial:")
+                lines.append(("        ", field, required_message))
+            else:
+                lines.append("    pass")
+            if "type" in rule:
+                python_type, type_message = rule["type"]
+                # bool is an int subclass, it is never accepted as a number
+                bool_guard = " or value.__class__ is bool" if python_type not in ("bool", "str") else ""
+                lines.append(f"elif not isinstance(value, {python_type}){bool_guard}:")
+                lines.append(("    ", field, type_message))
+            for condition, message in rule["checks"]:
+                lines.append(f"elif {condition}:")
+                lines.append(("    ", field, message))
+            blocks.append(lines)
+
+        single = ["def validate(record, partial=False):",
+                  "    errors = {}",
+                  "    if not isinstance(record, dict):",
+                  "        return {'record': 'must be an object'}"]
+        single += self.__render(blocks, "    ", "errors[{field!r}] = {message!r}")
+        single.append("    return errors")
+
+        # the batch variant is one loop with all checks inlined, valid records allocate nothing
+        many = ["def validate_many(records, partial=False):",
+                "    failed = {}",
+                "    for index, record in enumerate(records):",
+                "        if not isinstance(record, dict):",
+                "            failed[index] = {'record': 'must be an object'}",
+                "            continue"]
+        many += self.__render(blocks, "        ", "failed.setdefault(index, {{}})[{field!r}] = {message!r}")
+        many.append("    return failed")
+        return "\n".join(single + [""] + many) + "\n"
+
+    def __render(self, blocks, indent, fail) -> list:
+        rendered = []
+        for lines in blocks:
+            for line in lines:
+                if isinstance(line, tuple):
+                    line = line[0] + fail.format(field=line[1], message=line[2])
+                rendered.append(indent + line)
+        return rendered
@@ -0,0 +1,174 @@
+import atexit
+import importlib
+import json
+import os
+import signal
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from sqlalchemy.exc import SQLAlchemyError
+from table.DBConnection import DBConnection
+from helper.QueryCache import QueryCache
+from helper.TableVersion import TableVersion
+
+class WarmStart:
+    """
+    Cache snapshot on disk and warm-up before the server accepts requests
+
+    With CACHE_SNAPSHOT_PATH the most read QueryCache entries are written to an SQLite file every
+    CACHE_SNAPSHOT_INTERVAL seconds and when the process exits. On the next start the entries are
+    loaded again if the database has not changed since the snapshot was written (SQLite: size
+    and modification time of the database file). Otherwise, or for other databases, the same
+    hot queries are run again to fill the cache. Before that, WARMUP_CONNECTIONS connections of
+    the pool are opened and models with a warm() classmethod build their in-memory structures.
+    """
+    SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH")
+    SNAPSHOT_INTERVAL = float(os.getenv("CACHE_SNAPSHOT_INTERVAL", 300))
+    SNAPSHOT_KEYS = int(os.getenv("CACHE_SNAPSHOT_KEYS", 200))
+    WARMUP = os.getenv("WARMUP", "true").lower() in ("1", "true", "yes")
+    WARMUP_KEYS = int(os.getenv("WARMUP_KEYS", 50))
+    WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", 5))
+
+    _timer = None
+
+    @classmethod
+    def start(cls) -> dict:
+        """warm up, then keep snapshots until the process exits, returns what was done"""
+        result = {"connections": 0, "models": 0, "restored": 0, "primed": 0}
+        if cls.WARMUP:
+            result["connections"] = cls.open_connections(cls.WARMUP_CONNECTIONS)
+            result["models"] = cls.warm_models()
+        if cls.SNAPSHOT_PATH and QueryCache.ENABLED:
+            restored = cls.restore(cls.SNAPSHOT_PATH)
+            result["restored"] = restored["restored"]
+            if cls.WARMUP:
+                result["primed"] = cls.prime(restored["prime"][:cls.WARMUP_KEYS])
+            atexit.register(cls.snapshot, cls.SNAPSHOT_PATH)
+            if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+                # a deploy stops the server with SIGTERM, exit normally so the snapshot is written
+                signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+            cls.__schedule()
+        return result
+
+    @staticmethod
+    def open_connections(count: int) -> int:
+        """check out `count` pool connections at once, so they are connected before the first request"""
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(DBConnection.engine.connect())
+        except SQLAlchemyError as e:
+            print(f"⚠️ Warm-up: could not open database connections: {e}")
+        finally:
+            for connection in connections:
+                connection.close()
+        return len(connections)
+
+    @staticmethod
+    def warm_models() -> int:
+        """call warm() of every model in model/ that has one, returns how many did warm up"""
+        warmed = 0
+        for file in sorted((Path(__file__).parent.parent / "model").glob("*Model.py")):
+            try:
+                model_class = getattr(importlib.import_module(f"model.{file.stem}"), file.stem, None)
+                if model_class is not None and callable(getattr(model_class, "warm", None)) and model_class.warm():
+                    warmed += 1
+            except Exception as e:
+                print(f"⚠️ Warm-up of {file.stem} failed: {e}")
+        return warmed
+
+    @classmethod
+    def snapshot(cls, path: str) -> int:
+        """write the most read cache entries that are still current, returns the number written"""
+        # before the entries: a write after this point changes the state and voids the snapshot
+        state = cls.__database_state()
+        rows = []
+        for key, tables, parts, reads in QueryCache.hot(cls.SNAPSHOT_KEYS):
+            entry = QueryCache.backend.get(key)
+            current = entry is not None and entry[0] == TableVersion.token(*tables)
+            rows.append((key, json.dumps(tables), json.dumps(parts, default=str), reads,
+                         json.dumps(entry[2], default=str) if current else None,
+                         entry[1] if current else None))
+        try:
+            with sqlite3.connect(path) as connection:
+                connection.execute("DROP TABLE IF EXISTS entries")
+                connection.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, tables TEXT, parts TEXT, "
+                                   "reads INTEGER, value TEXT, stored REAL)")
+                connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+                connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)", rows)
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('database', ?)", (state,))
+            connection.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache snapshot failed: {e}")
+            return 0
+        return len(rows)
+
+    @classmethod
+    def restore(cls, path: str) -> dict:
+        """
+        load the entries of a snapshot into the cache if the database did not change since
+        {"restored": n, "prime": [parts, ...]} where prime lists the hot keys that were not loaded
+        """
+        result = {"restored": 0, "prime": []}
+        if not os.path.exists(path):
+            return result
+        try:
+            with sqlite3.connect(path) as connection:
+                state = connection.execute("SELECT value FROM meta WHERE name = 'database'").fetchone()
+                rows = connection.execute("SELECT key, tables, parts, reads, value, stored FROM entries ORDER BY reads DESC").fetchall()
+            connection.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache snapshot could not be read: {e}")
+            return result
+        unchanged = state is not None and state[0] is not None and state[0] == cls.__database_state()
+        for key, tables, parts, reads, value, stored in rows:
+            tables, parts = tuple(json.loads(tables)), json.loads(parts)
+            # the keys stay hot for the next snapshot even before they are read again
+            QueryCache.track(key, tables, parts, reads)
+            if unchanged and value is not None:
+                QueryCache.backend.set(key, (TableVersion.token(*tables), stored, json.loads(value)))
+                result["restored"] += 1
+            else:
+                result["prime"].append(parts)
+        return result
+
+    @staticmethod
+    def prime(keys: list) -> int:
+        """run the reads behind cache keys ([model class, method, args]) again to fill the cache"""
+        primed = 0
+        for model_name, method, args in keys:
+            try:
+                module = importlib.import_module(f"model.{model_name}")
+                model = getattr(module, model_name)()
+                if getattr(model, method)(*args) is not None:
+                    primed += 1
+            except Exception as e:
+                print(f"⚠️ Warm-up of {model_name}.{method} failed: {e}")
+        return primed
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __database_state() -> str|None:
+        """size and modification time of an SQLite database file, None for other databases"""
+        url = DBConnection.engine.url
+        if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+            return None
+        state = []
+        for suffix in ("", "-wal"):
+            try:
+                stat = os.stat(url.database + suffix)
+                state.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+            except OSError:
+                state.append("-")
+        return "|".join(state)
+
+    @classmethod
+    def __schedule(cls):
+        def snapshot():
+            cls.snapshot(cls.SNAPSHOT_PATH)
+            cls.__schedule()
+        cls._timer = threading.Timer(cls.SNAPSHOT_INTERVAL, snapshot)
+        cls._timer.daemon = True
+        cls._timer.start()
@@ -0,0 +1,61 @@
+import os
+import threading
+from urllib.parse import quote
+from table.DBConnection import DBConnection
+from helper.Application import Application
+
+class WsgiAdapter:
+    """
+    WSGI application (PEP 3333) around Application, for gunicorn, uWSGI, waitress, mod_wsgi, ...
+
+        SHARED_CACHE_PATH=/dev/shm/micropy.cache gunicorn --workers 4 --threads 8 --bind 0.0.0.0:8001 wsgi:application
+
+    Controllers get the same data and headers as behind HttpHandler. The request path is the
+    PATH_INFO below the mount point (SCRIPT_NAME), so the framework can be mounted under a prefix.
+
+    The warm-up of Application.start() runs once in every worker process, on its first request
+    or earlier from a post-fork hook calling start(). Never at import: with gunicorn --preload
+    the import happens in the master, whose connections and timer thread do not survive the fork.
+    """
+    # safe characters of a path, the rest is percent-encoded again like http.server receives it
+    PATH_SAFE = "/:@!$&'()*+,;=-._~"
+
+    def __init__(self):
+        # process that ran the warm-up, a forked worker has another pid
+        self._started = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """warm up this process once, safe to call from a post-fork hook and from every request"""
+        with self._lock:
+            if self._started != os.getpid():
+                if self._started is not None:
+                    # forked from a process that already warmed up: its pooled connections stay with it
+                    DBConnection.engine.dispose(close=False)
+                Application.start()
+                self._started = os.getpid()
+
+    def __call__(self, environ, start_response):
+        if self._started != os.getpid():
+            self.start()
+        path = quote(environ.get("PATH_INFO", "").encode("latin-1"), safe=self.PATH_SAFE) or "/"
+        if environ.get("QUERY_STRING"):
+            path += "?" + environ["QUERY_STRING"]
+        application = Application(environ["REQUEST_METHOD"], path, Application.request_headers(self.__headers(environ)),
+                                  environ["wsgi.input"], environ.get("REMOTE_ADDR", ""),
+                                  until_eof=bool(environ.get("wsgi.input_terminated")))
+        # close_connection is not passed on, hop-by-hop headers are up to the WSGI server
+        status_code, headers, body = application.handle()
+        start_response(f"{status_code} {Application.reason(status_code)}", headers)
+        return [body]
+
+#--------------------Private Methods ---------------------------------------
+
+    @staticmethod
+    def __headers(environ):
+        """(name, value) pairs from the CGI style HTTP_* keys, HTTP_X_API_KEY -> X-Api-Key"""
+        for key, value in environ.items():
+            if key.startswith("HTTP_"):
+                yield key[5:].replace("_", "-").title(), value
+            elif key in ("CONTENT_TYPE", "CONTENT_LENGTH") and value:
+                yield key.replace("_", "-").title(), value
@@ -0,0 +1,25 @@
+from abc import ABC,abstractmethod
+
+class ICache(ABC):
+    """
+    Key-value storage for the QueryCache.
+    Keys are strings, values are JSON-like (dicts, lists, strings, numbers). A cache may drop
+    any entry at any time, e.g. to stay within its memory budget.
+    """
+
+    @abstractmethod
+    def get(self, key: str):
+        """the value for key, None if it is not cached"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
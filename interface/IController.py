@@ -1,6 +1,8 @@
 from abc import ABC,abstractmethod
 
 class IController(ABC):
+    # address of the client of the current request, set by the Dispatcher on every instance
+    client_address = ""
 
     @abstractmethod
     def post():
@@ -0,0 +1,19 @@
+from abc import ABC,abstractmethod
+
+class IIdempotencyStore(ABC):
+    """
+    Storage of the first response per Idempotency-Key.
+    A record is a dict {"fingerprint": str|None, "status": int, "body": bytes, "headers": dict|None}.
+    Stores are bounded and forget records after their TTL, implement this interface to keep the
+    records somewhere else (e.g. Redis).
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> None|dict:
+        """the record for key, None if there is none or it has expired"""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, record: dict, ttl: float) -> None:
+        """keep the record for ttl seconds"""
+        pass
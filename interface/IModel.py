@@ -1,6 +1,37 @@
 from abc import ABC,abstractmethod
+from typing import List
+from sqlalchemy import select, bindparam, func
+from sqlalchemy.exc import SQLAlchemyError
+from table.DBConnection import DBConnection
+from helper.QueryFilter import QueryFilter
+from helper.SearchIndex import SearchIndex
+from helper.QueryCache import QueryCache
 
 class IModel(ABC):
+    # set by the model: the table class and optionally the columns that may leave the model
+    table = None
+    columns = None
+    # allow-lists for the ?field__op=value&sort=-field DSL of list endpoints (see QueryFilter)
+    filterable = ()
+    sortable = ()
+    # columns allowed in min/max/avg/sum of aggregate()
+    aggregatable = ()
+    # results of list/query/count/aggregate go through the QueryCache
+    cache_results = True
+
+    # ids per IN (...) statement, stays below the bound parameter limit of every backend
+    # (SQLite before 3.32 allows 999)
+    IN_CHUNK_SIZE = 500
+
+    # read-only fast path: statements and row mappers are built once per (table, columns)
+    _statements = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.table is not None:
+            # checked once when the model is imported: a filter without an index scans the table
+            for field in QueryFilter.unindexed(cls):
+                print(f"⚠️ {cls.__name__}: '{field}' is filterable/sortable but not indexed in '{cls.table.__tablename__}'")
 
     @abstractmethod
     def create()->None|object:
@@ -9,7 +40,7 @@ class IModel(ABC):
     @abstractmethod
     def update()->None|object:
         pass
-    
+
     @abstractmethod
     def single(id :int)->None|object:
         pass
@@ -21,4 +52,167 @@ class IModel(ABC):
     @abstractmethod
     def list()->None|list:
         pass
-    
+
+    def fetchAll(self, columns: tuple = None, tuples: bool = False, where: list = None,
+                 order_by: list = None, limit: int = None, offset: int = None, search: str = None) -> None|List:
+        """
+        read-only fast path: Core SELECT on the mapped table, rows go straight into dicts
+        (or tuples) without ORM instances, identity map or change tracking
+        search: full-text query on the FTS index of the table, ranked unless order_by is given
+        """
+        statement, mapper = self._compiled(columns, tuples)
+        if search is not None:
+            statement = SearchIndex.apply(statement, self.table, search, ranked=not order_by)
+            if limit is None:
+                limit = SearchIndex.DEFAULT_LIMIT
+        if where:
+            statement = statement.where(*where)
+        if order_by:
+            statement = statement.order_by(*order_by)
+        if limit is not None:
+            statement = statement.limit(limit)
+        if offset:
+            statement = statement.offset(offset)
+        try:
+            with DBConnection.engine.connect() as connection:
+                return mapper(connection.execute(statement))
+        except SQLAlchemyError as e:
+            self.error = f"Database failure: {str(e)}"
+            return None
+
+    def query(self, params: dict, ignore: tuple = ()) -> None|List:
+        """
+        list with filters, sorting, paging and search from query parameters (?ps__gte=100&sort=-ps&limit=20&q=bmw)
+        returns None and sets self.error when the parameters are not allowed
+        """
+        return self.cached("query", (params, ignore), lambda: self.__query(params, ignore))
+
+    def count(self, params: dict = None, ignore: tuple = ()) -> None|int:
+        """number of rows matching the filters and search of query(params), no row is loaded"""
+        return self.cached("count", (params, ignore), lambda: self.__count(params, ignore))
+
+    def aggregate(self, params: dict = None, ignore: tuple = ()) -> None|List:
+        """
+        grouped count/min/max/avg/sum as one SQL statement (?group_by=name&metrics=count,avg:ps)
+        filters and search of query(params) apply, one dict per group ordered by the group keys
+        """
+        return self.cached("aggregate", (params, ignore), lambda: self.__aggregate(params, ignore))
+
+    def cached(self, method: str, args: tuple, loader):
+        """
+        result of loader() through the QueryCache, keyed by model, method and args
+        the result is shared with other requests and must not be changed
+        """
+        if not QueryCache.ENABLED or not self.cache_results:
+            return loader()
+        return QueryCache.fetch((self.table.__tablename__,), (type(self).__name__, method, args), loader)
+
+    def fetchOne(self, id, columns: tuple = None) -> None|dict:
+        """single row by primary key through the read-only fast path"""
+        statement, mapper = self._compiled(columns, False, by_id=True)
+        try:
+            with DBConnection.engine.connect() as connection:
+                rows = mapper(connection.execute(statement, {"id": id}))
+                return rows[0] if rows else None
+        except SQLAlchemyError as e:
+            self.error = f"Database failure: {str(e)}"
+            return None
+
+    def many(self, ids: list) -> None|dict:
+        """
+        fetch several rows by primary key with one `WHERE id IN (...)` per chunk
+        returns {"items": [...], "missing": [...]}, items are in the order of the requested ids
+        """
+        ids = list(dict.fromkeys(ids))
+        primary_key = self.table.__table__.primary_key.columns[0]
+        statement, mapper = self._compiled(None, False)
+        found = {}
+        try:
+            with DBConnection.engine.connect() as connection:
+                for start in range(0, len(ids), self.IN_CHUNK_SIZE):
+                    chunk = ids[start:start + self.IN_CHUNK_SIZE]
+                    for row in mapper(connection.execute(statement.where(primary_key.in_(chunk)))):
+                        found[row[primary_key.name]] = row
+        except SQLAlchemyError as e:
+            self.error = f"Database failure: {str(e)}"
+            return None
+        return {
+            "items": [found[id] for id in ids if id in found],
+            "missing": [id for id in ids if id not in found]
+        }
+
+    def _source(self, statement, search: str = None):
+        """FROM clause for count/aggregate statements: the table, or the table joined to its search index"""
+        if search is not None:
+            return SearchIndex.apply(statement, self.table, search, ranked=False)
+        return statement.select_from(self.table.__table__)
+
+    def _compiled(self, columns: tuple = None, tuples: bool = False, by_id: bool = False):
+        """(statement, mapper) for the given columns, built on first use and cached"""
+        columns = tuple(columns or self.columns or (column.name for column in self.table.__table__.columns))
+        key = (self.table, columns, tuples, by_id)
+        compiled = IModel._statements.get(key)
+        if compiled is None:
+            table = self.table.__table__
+            statement = select(*(table.c[name] for name in columns))
+            if by_id:
+                statement = statement.where(table.primary_key.columns[0] == bindparam("id"))
+            if tuples:
+                mapper = lambda result: [tuple(row) for row in result]
+            else:
+                mapper = lambda result: [dict(zip(columns, row)) for row in result]
+            compiled = (statement, mapper)
+            IModel._statements[key] = compiled
+        return compiled
+
+#--------------------Private Methods ---------------------------------------
+
+    def __query(self, params: dict, ignore: tuple) -> None|List:
+        try:
+            query = QueryFilter.parse(self, params or {}, ignore)
+        except ValueError as e:
+            self.error = str(e)
+            return None
+        return self.fetchAll(**query)
+
+    def __count(self, params: dict, ignore: tuple) -> None|int:
+        try:
+            query = QueryFilter.parse(self, params or {}, ignore)
+        except ValueError as e:
+            self.error = str(e)
+            return None
+        statement = self._source(select(func.count()), query["search"])
+        if query["where"]:
+            statement = statement.where(*query["where"])
+        try:
+            with DBConnection.engine.connect() as connection:
+                return connection.execute(statement).scalar()
+        except SQLAlchemyError as e:
+            self.error = f"Database failure: {str(e)}"
+            return None
+
+    def __aggregate(self, params: dict, ignore: tuple) -> None|List:
+        params = params or {}
+        try:
+            query = QueryFilter.parse(self, params, ignore)
+            stats = QueryFilter.aggregates(self, params)
+            if query["order_by"]:
+                raise ValueError("'sort' is not supported for aggregates, groups are ordered by their keys")
+        except ValueError as e:
+            self.error = str(e)
+            return None
+        statement = self._source(select(*stats["group_by"], *stats["metrics"]), query["search"])
+        if query["where"]:
+            statement = statement.where(*query["where"])
+        if stats["group_by"]:
+            statement = statement.group_by(*stats["group_by"]).order_by(*stats["group_by"])
+        if query["limit"] is not None:
+            statement = statement.limit(query["limit"])
+        if query["offset"]:
+            statement = statement.offset(query["offset"])
+        try:
+            with DBConnection.engine.connect() as connection:
+                return [dict(zip(stats["names"], row)) for row in connection.execute(statement)]
+        except SQLAlchemyError as e:
+            self.error = f"Database failure: {str(e)}"
+            return None
@@ -0,0 +1,16 @@
+from abc import ABC,abstractmethod
+
+class IRateLimitStore(ABC):
+    """
+    Storage of token buckets for the RateLimiter.
+    The in-memory store works for one process, implement this interface to share the buckets
+    between processes or machines (e.g. Redis, memcached).
+    """
+
+    @abstractmethod
+    def consume(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        take `cost` tokens from the bucket `key` that refills with `rate` tokens per second up to `burst`
+        returns 0 when the tokens were taken, otherwise the seconds until enough tokens are available
+        """
+        pass
@@ -1,39 +1,64 @@
 from table.AutoTable import AutoTable
 from table.DBConnection import DBConnection
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import insert
 from interface.IModel import IModel
-from helper.FormatCheck import FormatCheck
+from helper.TableVersion import TableVersion
+from helper.Validator import Validator
+from helper.GroupCommit import GroupCommit
+from helper.HttpError import HttpError
 
 class AutoModel(IModel): 
+    table = AutoTable
+    filterable = ("name", "ps")
+    sortable = ("id", "name", "ps")
+    aggregatable = ("ps",)
+    validator = Validator(AutoTable,
+        name={"min_length": (2, "Name must be at least 2 characters long")},
+        ps={"type": "PS must be a number", "gt": (0, "PS must be greater than 0")},
+    )
+
     def __init__(self):
         self.Session = DBConnection.Session
         self.error = None
     
     def create(self,name:str, ps:int)->None|bool:
-        validation_result = self.__validateData(name=name,ps=ps)
+        validation_result = self.__validateData(name=name, ps=ps, partial=False)
         if not validation_result:
             return None
         return self.__insert(name=name, ps=ps)
          
+    def createMany(self, records, batch_size: int = 500) -> dict:
+        """
+        bulk insert for large imports, records is an iterable of (line number, record), e.g. a
+        streamed NDJSON upload (RequestBody.records()). Rows are validated and inserted in batches,
+        one validator pass and one transaction per batch. If the upload breaks off (invalid JSON,
+        too large), the records before it are still inserted and result["error"] tells the status
+        code, the message and the line it stopped at
+        """
+        result = {"created": 0, "failed": []}
+        batch, lines = [], []
+        line = 0
+        self.error = None
+        try:
+            for line, record in records:
+                batch.append(record)
+                lines.append(line)
+                if len(batch) >= batch_size:
+                    self.__insertMany(batch, lines, result)
+                    batch, lines = [], []
+        except HttpError as e:
+            self.error = e.message
+            result["error"] = {"status_code": e.status_code, "message": e.message, "line": e.line or line + 1}
+        if batch:
+            self.__insertMany(batch, lines, result)
+        return result
+
     def single(self,id:int)->None|dict:
-        with self.Session() as session:
-            try:
-                auto = session.query(AutoTable).filter_by(id=id).first()
-                if auto:
-                    return {"id": auto.id, "name": auto.name, "ps": auto.ps}
-                return None
-            except SQLAlchemyError as e:
-                self.error = f"Database failure: {str(e)}"
-                return None
+        return self.fetchOne(id)
 
     def list(self):
-        with self.Session() as session:
-            try:
-                autos = session.query(AutoTable).all()
-                return [{"id":auto.id , "name":auto.name , "ps":auto.ps} for auto in autos]
-            except SQLAlchemyError as e:
-                self.error = f"Database failure: {str(e)}"
-                return None
+        return self.cached("list", (), self.fetchAll)
 
     def update(self, auto_id: int , name:str = None , ps: int = None)->AutoTable|None:
         auto = self.single(auto_id)
@@ -56,6 +81,7 @@ class AutoModel(IModel):
                             AutoTable.ps:ps
                     })          
                 session.commit()
+                TableVersion.bump(AutoTable.__tablename__)
                 return self.single(auto_id)
             except SQLAlchemyError as e:
                 session.rollback()
@@ -75,32 +101,57 @@ class AutoModel(IModel):
                     return False
                 session.delete(auto_to_delete)
                 session.commit()
+                TableVersion.bump(AutoTable.__tablename__)
                 return True
             except SQLAlchemyError as e:
                 session.rollback()
                 self.error = f"Database error: {str(e)}"
                 return False
 
-    def __validateData(self, name: str = None, ps: int = None) -> bool:
-        if name and not FormatCheck.minimumLength(name, 2):
-            self.error = "Name must be at least 2 characters long"
-            return False
-        if ps is not None and not isinstance(ps, int):
-            self.error = "PS must be a number"
-            return False
-        if ps is not None and ps <= 0:
-            self.error = "PS must be greater than 0"
+    def __validateData(self, name: str = None, ps: int = None, partial: bool = True) -> bool:
+        errors = self.validator.validate({"name": name, "ps": ps}, partial)
+        if errors:
+            self.error = Validator.message(errors)
             return False
         return True
     
     def __insert(self, name: str, ps: int) -> bool:
+        if GroupCommit.ENABLED:
+            try:
+                GroupCommit.insert(AutoTable, {"name": name, "ps": ps})
+                return True
+            except SQLAlchemyError as e:
+                self.error = f"Database failure: {str(e)}"
+                return False
         with self.Session() as session:
             try:
                 new_auto = AutoTable(name=name, ps=ps)
                 session.add(new_auto)
                 session.commit()
+                TableVersion.bump(AutoTable.__tablename__)
                 return True
             except SQLAlchemyError as e:
                 session.rollback()
                 self.error = f"Database failure: {str(e)}"
-                return False
\ No newline at end of file
+                return False
+
+    def __insertMany(self, records: list, lines: list, result: dict) -> None:
+        failed = self.validator.validate_many(records)
+        rows = []
+        for index, record in enumerate(records):
+            if index in failed:
+                result["failed"].append({"line": lines[index], "error": Validator.message(failed[index])})
+            else:
+                rows.append({"name": record["name"], "ps": record["ps"]})
+        if not rows:
+            return
+        lines = [line for index, line in enumerate(lines) if index not in failed]
+        with self.Session() as session:
+            try:
+                session.execute(insert(AutoTable), rows)
+                session.commit()
+                TableVersion.bump(AutoTable.__tablename__)
+                result["created"] += len(rows)
+            except SQLAlchemyError as e:
+                session.rollback()
+                result["failed"].extend({"line": line, "error": f"Database failure: {str(e)}"} for line in lines)
@@ -1,22 +1,50 @@
 from table.UserTable import UserTable
 from table.DBConnection import DBConnection
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 import bcrypt
-from helper.FormatCheck import FormatCheck
+import os
+import threading
+from helper.Validator import Validator
 from interface.IModel import IModel
+from helper.TableVersion import TableVersion
+from helper.GroupCommit import GroupCommit
+from helper.BloomFilter import BloomFilter
 from sqlalchemy import update
 
 class UserModel(IModel): 
+    table = UserTable
+    columns = ("id", "name", "email")  # password hashes never leave the model through many()
+    validator = Validator(UserTable,
+        email={"email": (True, "your given email address doesn't follow email format, please check email address and try again")},
+        password={"min_length": (6, "password length must have at least 6 characters")},
+        name={"min_length": (2, "name length must have at least 2 characters")},
+    )
+
+    # in-memory Bloom filter of registered emails: "definitely new" skips the lookup before the insert
+    BLOOM_FILTER = os.getenv("USER_BLOOM_FILTER", "true").lower() in ("1", "true", "yes")
+    BLOOM_CAPACITY = int(os.getenv("USER_BLOOM_CAPACITY", 100000))
+    _emails = None
+    _emails_lock = threading.Lock()
+
     def __init__(self):
         self.Session = DBConnection.Session
         self.error = None
+        self.conflict = False
+
+    @classmethod
+    def warm(cls) -> bool:
+        """build the Bloom filter at startup (WarmStart), so the first signup does not read the users table"""
+        return cls.BLOOM_FILTER and cls.__knownEmails() is not None
     
     def create(self,email:str, password:str , name: str)->None|bool:
-        validation_result = self.__validateUserInfo(name=name,email=email)
+        validation_result = self.__validateUserInfo({"email": email, "password": password, "name": name})
         if not validation_result:
             return None
-        if self.singleByEmail(email):
+        # the unique constraint on email decides, the lookup only saves the password hashing
+        # for emails the Bloom filter has seen before
+        if self.__maybeRegistered(email) and self.singleByEmail(email):
             self.error = "user already exists"
+            self.conflict = True
             return None
         #hashing password before insert into database
         hash_pass = self.__setPassword(password=password)
@@ -33,12 +61,8 @@ class UserModel(IModel):
                 return None
 
     def list(self):
-        # with ist ein Ansatz dass macht Resouces frei nach dem nutzung. SQL Alchemy empfehlt thise method
-        with self.Session() as session:
-            #session.query: ermöglich uns zu Sagen was genau brauchen wir von allem Spalten von Tabelle
-            # all() ist method das bringt zurück all data in table. (select * ) 
-            users  = session.query(UserTable).all()
-            return [{"id":user.id , "name":user.name , "email":user.email , "password":user.password} for user in users] 
+        # read-only fast path, rows go straight into dicts without ORM objects (see IModel.fetchAll)
+        return self.fetchAll(("id", "name", "email", "password"))
     
     def singleByEmail(self, email:str)->None|UserTable:
         with self.Session() as session:
@@ -55,9 +79,8 @@ class UserModel(IModel):
             self.error = "User not found"
             return None
 
-        if 'name' in data:
-            if not self.__validateUserInfo(name=data['name']):
-                return None
+        if not self.__validateUserInfo(data, partial=True):
+            return None
 
         with self.Session() as session:
             try:
@@ -74,6 +97,7 @@ class UserModel(IModel):
                         UserTable.password: hashed_password
                     })
                 session.commit()
+                TableVersion.bump(UserTable.__tablename__)
                 return self.single(id)
             except SQLAlchemyError as e:
                 session.rollback()
@@ -89,6 +113,7 @@ class UserModel(IModel):
             try:
                 session.delete(user)
                 session.commit()
+                TableVersion.bump(UserTable.__tablename__)
                 return True
             except SQLAlchemyError as e:
                 session.rollback()
@@ -99,33 +124,64 @@ class UserModel(IModel):
 
 #--------------------Private Methods ---------------------------------------
 
-    def __validateUserInfo(self, name: str = None , email: str = None)->bool:
-        if name:
-            if not FormatCheck.minimumLength(name,2):
-                self.error = "name length must have at least 2 characters"
-                return False
-        if email:
-            if not FormatCheck.email(email=email):
-                self.error = "your given email address doesn't follow email format, please check email address and try again"
-                return False
+    def __validateUserInfo(self, data: dict, partial: bool = False)->bool:
+        errors = self.validator.validate(data, partial)
+        if errors:
+            self.error = Validator.message(errors)
+            return False
         return True
     
     def __setPassword(self, password:str)->None|str:
-        if not FormatCheck.minimumLength(password,6):
-            self.error = "password length must have at least 6 characters"
-            return None
+        # length is checked by the validator before a password gets here
         return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
     
+    def __maybeRegistered(self, email: str) -> bool:
+        if not self.BLOOM_FILTER:
+            return False
+        emails = self.__knownEmails()
+        return emails is None or email in emails
+
+    @classmethod
+    def __knownEmails(cls) -> None|BloomFilter:
+        """built once from the users table at warm-up or on first use, None if the table can not be read"""
+        if cls._emails is None:
+            with cls._emails_lock:
+                if cls._emails is None:
+                    rows = UserModel().fetchAll(("email",), tuples=True)
+                    if rows is None:
+                        return None
+                    emails = BloomFilter(max(cls.BLOOM_CAPACITY, 2 * len(rows)))
+                    for (email,) in rows:
+                        emails.add(email)
+                    cls._emails = emails
+        return cls._emails
+
     def __insert(self,email:str, password:str , name: str)->bool:
-        with self.Session() as session:
-            try:
-                new_user = UserTable(email=email,password=password,name=name)
-                session.add(new_user)
-            #method commit schreib änderungen in Datanbank , egal insert, update, oder delete . 
-            # ohne commit , änderungen bleibt in session , und datenbank wurde Aktualiert nicht! 
-                session.commit()
-                return True
-            except SQLAlchemyError as e:
-                session.rollback()
+        try:
+            if GroupCommit.ENABLED:
+                GroupCommit.insert(UserTable, {"email": email, "password": password, "name": name})
+            else:
+                with self.Session() as session:
+                    try:
+                        new_user = UserTable(email=email,password=password,name=name)
+                        session.add(new_user)
+                    #method commit schreib änderungen in Datanbank , egal insert, update, oder delete . 
+                    # ohne commit , änderungen bleibt in session , und datenbank wurde Aktualiert nicht! 
+                        session.commit()
+                    except SQLAlchemyError:
+                        session.rollback()
+                        raise
+                    TableVersion.bump(UserTable.__tablename__)
+        except IntegrityError as e:
+            if "email" not in str(e.orig).lower():
                 self.error = f"Database failure: {str(e)}"
-                return False
\ No newline at end of file
+                return False
+            self.error = "user already exists"
+            self.conflict = True
+            return False
+        except SQLAlchemyError as e:
+            self.error = f"Database failure: {str(e)}"
+            return False
+        if self._emails is not None:
+            self._emails.add(email)
+        return True
\ No newline at end of file
@@ -0,0 +1,28 @@
+import argparse
+import json
+from helper.TrafficReplay import TrafficReplay
+
+def main():
+    """
+    Replay captured traffic (TRAFFIC_CAPTURE_PATH) against a running server
+
+    python replay.py traffic.jsonl --url http://localhost:8001 --speed 1      original timing
+    python replay.py traffic.jsonl --speed 5                                  five times as fast
+    python replay.py traffic.jsonl --speed 0 --workers 32                     as fast as possible
+    """
+    parser = argparse.ArgumentParser(description="Replay captured traffic and report latencies and response differences")
+    parser.add_argument("file", nargs="?", default="traffic.jsonl")
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = original rate, 2 = twice as fast, 0 = maximum")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--token", help="Bearer token for requests that were captured with an Authorization header")
+    parser.add_argument("--limit", type=int, help="replay only the first N requests")
+    args = parser.parse_args()
+
+    records = TrafficReplay.load(args.file, args.limit)
+    print(f"🚀 Replaying {len(records)} requests from {args.file} against {args.url}...")
+    replay = TrafficReplay(args.url, token=args.token, speed=args.speed, workers=args.workers)
+    print(json.dumps(replay.run(records), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+from sqlalchemy.exc import SQLAlchemyError
+from helper.DataSeeder import DataSeeder
+
+def main():
+    """
+    Fill the tables with synthetic rows for benchmarks (run migrate.py first)
+
+    python seed.py autos=1000000 users=100000                   default distributions, seed 42
+    python seed.py autos=1000000 --skew 1.5 --seed 7            more skewed names, other rows
+    python seed.py autos=500000 --dist autos.ps=normal:150:60   horsepower around 150
+    """
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic rows into the tables of table/")
+    parser.add_argument("counts", nargs="+", metavar="TABLE=ROWS")
+    parser.add_argument("--seed", type=int, default=42, help="the same seed produces the same rows")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for string columns, 0 = uniform")
+    parser.add_argument("--batch-size", type=int, help="rows per transaction (default SEED_BATCH_SIZE or 50000)")
+    parser.add_argument("--dist", action="append", default=[], metavar="TABLE.COLUMN=SPEC",
+                        help="uniform:LOW:HIGH, normal:MEAN:STDDEV, zipf:S[:N], choice:a|b|c or sequence")
+    args = parser.parse_args()
+
+    try:
+        counts = {name: int(rows) for name, rows in (count.split("=", 1) for count in args.counts)}
+        distributions = dict(dist.split("=", 1) for dist in args.dist)
+    except ValueError:
+        parser.error("expected TABLE=ROWS and TABLE.COLUMN=SPEC")
+
+    seeder = DataSeeder(seed=args.seed, skew=args.skew, batch_size=args.batch_size, distributions=distributions)
+    print(f"🚀 Seeding {', '.join(f'{name}={rows}' for name, rows in counts.items())} (seed {args.seed})...")
+    try:
+        for result in seeder.run(counts):
+            print(f"✅ {result['table']}: {result['rows']} rows in {result['seconds']}s ({result['rate']} rows/s)")
+    except (ValueError, SQLAlchemyError) as e:
+        print(f"❌ Seeding failed: {e}")
+        return
+    if "users" in counts:
+        print(f"📝 Seeded users log in with seed-password-0 ... seed-password-{DataSeeder.PASSWORD_POOL - 1}")
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,12 @@ from .DBConnection import Base
 
 class AutoTable(Base):
     __tablename__ = "autos"
+    # full-text search index maintained by the migration, see helper/SearchIndex.py
+    __searchable__ = ("name",)
 
     id = Column(Integer , primary_key=True, autoincrement=True)
-    name = Column(String,nullable=False)
-    ps = Column(Integer,nullable=False)
+    name = Column(String,nullable=False,index=True)
+    ps = Column(Integer,nullable=False,index=True)
 
     def __repr__(self):
         return f"Auto(id='{self.id}',name='{self.name}',ps='{self.ps}')"
@@ -0,0 +1,12 @@
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from helper.WsgiAdapter import WsgiAdapter
+
+# SHARED_CACHE_PATH=/dev/shm/micropy.cache gunicorn --workers 4 --threads 8 --bind 0.0.0.0:8001 wsgi:application
+# several workers need SHARED_CACHE_PATH to invalidate each other's caches, see Application.start()
+# the warm-up runs in each worker on its first request, or right after the fork with a gunicorn
+# post_fork hook that calls application.start() (see DOCUMENTATION.md)
+application = WsgiAdapter()